@@ -0,0 +1 @@
+"""Offline benchmarks of the PETLIBRO integration against a mock cloud."""
@@ -0,0 +1,268 @@
+"""
+Local stand-in of the PETLIBRO cloud API
+
+Simulates an account with any number of Granary feeders, with configurable latency, error rate and rate limit.
+
+    python -m bench.mock_cloud --devices 100 --latency 0.05 --error-rate 0.01
+"""
+
+from __future__ import annotations
+
+from argparse import ArgumentParser
+from asyncio import run, sleep, Event as AsyncEvent
+from collections import Counter
+from dataclasses import dataclass, field
+from random import Random
+from time import monotonic, time
+from typing import Any, Awaitable, Callable
+
+from aiohttp import web
+
+PRODUCT_NAME = "Granary Feeder"
+PRODUCT_IDENTIFIER = "PLAF103"
+
+
+@dataclass
+class MockSettings:
+    """Mock cloud behavior."""
+
+    devices: int = 1
+    latency: float = 0.0
+    """Mean response latency in seconds."""
+    jitter: float = 0.0
+    """Maximum latency deviation in seconds."""
+    error_rate: float = 0.0
+    """Ratio of requests answered with an HTTP 500."""
+    rate_limit: float | None = None
+    """Requests per second accepted before answering HTTP 429, unlimited if not set."""
+    change_rate: float = 0.1
+    """Ratio of live state reads returning a changed state."""
+    seed: int = 0
+
+
+@dataclass
+class MockDevice:
+    """A simulated feeder."""
+
+    serial: str
+    name: str
+    feeding_plan: bool = True
+    all_skipped: bool = False
+    feeding_times: int = 0
+    feeding_quantity: int = 0
+    desiccant_days: int = 30
+    records: list[dict[str, Any]] = field(default_factory=list)
+
+    def list_info(self) -> dict[str, Any]:
+        return {
+            "deviceSn": self.serial,
+            "name": self.name,
+            "productName": PRODUCT_NAME,
+            "productIdentifier": PRODUCT_IDENTIFIER,
+            "mac": ":".join(f"{byte:02x}" for byte in int(self.serial[2:]).to_bytes(6, "big")),
+        }
+
+    def base_info(self) -> dict[str, Any]:
+        return self.list_info() | {
+            "softwareVersion": "1.0.0",
+            "hardwareVersion": "1.0",
+            "unitType": 1,
+        }
+
+    def real_info(self) -> dict[str, Any]:
+        return {
+            "online": True,
+            "enableFeedingPlan": self.feeding_plan,
+            "remainingDesiccantDays": self.desiccant_days,
+            "unitType": 1,
+        }
+
+    def grain_status(self) -> dict[str, Any]:
+        return {
+            "todayFeedingTimes": self.feeding_times,
+            "todayFeedingQuantity": self.feeding_quantity,
+        }
+
+    def feeding_plan_today(self) -> dict[str, Any]:
+        return {
+            "allSkipped": self.all_skipped,
+            "plans": [
+                {"id": 1, "executionTime": "08:00", "grainNum": 2, "skip": self.all_skipped},
+                {"id": 2, "executionTime": "18:00", "grainNum": 2, "skip": self.all_skipped},
+            ],
+        }
+
+
+@dataclass
+class MockCloud:
+    """The mock cloud state and its request counters."""
+
+    settings: MockSettings
+    devices: dict[str, MockDevice] = field(default_factory=dict)
+    requests: Counter[str] = field(default_factory=Counter)
+    errors: Counter[str] = field(default_factory=Counter)
+    _tokens: float = 0
+    _updated: float = field(default_factory=monotonic)
+
+    def __post_init__(self) -> None:
+        self.random = Random(self.settings.seed)
+        for index in range(self.settings.devices):
+            serial = f"AF{index:010d}"
+            self.devices[serial] = MockDevice(serial, f"Feeder {index}")
+        self._tokens = self.settings.rate_limit or 0
+
+    def reset_counters(self) -> None:
+        self.requests.clear()
+        self.errors.clear()
+
+    def _throttled(self) -> bool:
+        """Server side token bucket."""
+        if (rate := self.settings.rate_limit) is None:
+            return False
+        now = monotonic()
+        self._tokens = min(rate, self._tokens + (now - self._updated) * rate)
+        self._updated = now
+        if self._tokens < 1:
+            return True
+        self._tokens -= 1
+        return False
+
+    def _live_change(self, device: MockDevice) -> None:
+        """Randomly make the device state move."""
+        if self.random.random() < self.settings.change_rate:
+            device.feeding_times += 1
+            device.feeding_quantity += 2
+            device.records.append({
+                "recordType": "GRAIN_OUTPUT_SUCCESS",
+                "recordTime": int(time() * 1000) + len(device.records),
+                "expectGrainNum": 2,
+                "actualGrainNum": 2,
+            })
+
+    async def _device_data(self, request: web.Request) -> MockDevice:
+        body = await request.json()
+        if (device := self.devices.get(body.get("id") or body.get("deviceSn"))) is None:
+            raise web.HTTPOk(text='{"code": 1002, "msg": "Device not found"}', content_type="application/json")
+        return device
+
+    def handler(self, respond: Callable[[web.Request], Awaitable[Any]]) -> Callable[[web.Request], Awaitable[web.Response]]:
+        """Wrap an endpoint with the simulated latency, errors and rate limit."""
+        async def handle(request: web.Request) -> web.Response:
+            self.requests[request.path] += 1
+            if latency := self.settings.latency:
+                await sleep(max(0.0, latency + self.random.uniform(-self.settings.jitter, self.settings.jitter)))
+            if self._throttled():
+                self.errors[request.path] += 1
+                return web.Response(status=429)
+            if self.random.random() < self.settings.error_rate:
+                self.errors[request.path] += 1
+                return web.Response(status=500)
+            return web.json_response({"code": 0, "msg": None, "data": await respond(request)})
+        return handle
+
+    async def login(self, _: web.Request) -> Any:
+        return {"token": "mock-token"}
+
+    async def logout(self, _: web.Request) -> Any:
+        return None
+
+    async def device_list(self, _: web.Request) -> Any:
+        return [device.list_info() for device in self.devices.values()]
+
+    async def base_info(self, request: web.Request) -> Any:
+        return (await self._device_data(request)).base_info()
+
+    async def real_info(self, request: web.Request) -> Any:
+        return (await self._device_data(request)).real_info()
+
+    async def grain_status(self, request: web.Request) -> Any:
+        device = await self._device_data(request)
+        self._live_change(device)
+        return device.grain_status()
+
+    async def feeding_plan_today(self, request: web.Request) -> Any:
+        return (await self._device_data(request)).feeding_plan_today()
+
+    async def work_records(self, request: web.Request) -> Any:
+        device = await self._device_data(request)
+        self._live_change(device)
+        body = await request.json()
+        # Newest first, like the app history
+        records = [
+            record
+            for record in reversed(device.records)
+            if body["startTime"] <= record["recordTime"] <= body["endTime"]
+        ][:body.get("size", 20)]
+        return [{"date": "today", "workRecords": records}] if records else []
+
+    async def update_feeding_plan(self, request: web.Request) -> Any:
+        device = await self._device_data(request)
+        device.feeding_plan = bool((await request.json()).get("enable"))
+        return None
+
+    async def enable_today_all(self, request: web.Request) -> Any:
+        device = await self._device_data(request)
+        device.all_skipped = not (await request.json()).get("enable")
+        return None
+
+    def app(self) -> web.Application:
+        """Build the mock cloud application."""
+        app = web.Application()
+        app.add_routes([
+            web.post("/member/auth/login", self.handler(self.login)),
+            web.post("/member/auth/logout", self.handler(self.logout)),
+            web.post("/device/device/list", self.handler(self.device_list)),
+            web.post("/device/device/baseInfo", self.handler(self.base_info)),
+            web.post("/device/device/realInfo", self.handler(self.real_info)),
+            web.post("/device/data/grainStatus", self.handler(self.grain_status)),
+            web.post("/device/feedingPlan/todayNew", self.handler(self.feeding_plan_today)),
+            web.post("/device/workRecord/list", self.handler(self.work_records)),
+            web.post("/device/setting/updateFeedingPlanSwitch", self.handler(self.update_feeding_plan)),
+            web.post("/device/feedingPlan/enableTodayAll", self.handler(self.enable_today_all)),
+        ])
+        return app
+
+
+async def start_mock_cloud(cloud: MockCloud, host: str = "127.0.0.1", port: int = 0) -> tuple[web.AppRunner, str]:
+    """
+    Start the mock cloud
+
+    :return: The app runner, to clean it up, and the base URL of the mock cloud
+    """
+    runner = web.AppRunner(cloud.app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    sockets = site._server.sockets  # type: ignore[union-attr] # pylint: disable=protected-access
+    return runner, f"http://{host}:{sockets[0].getsockname()[1]}"
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--devices", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument("--change-rate", type=float, default=0.1)
+    args = parser.parse_args()
+
+    async def serve() -> None:
+        cloud = MockCloud(MockSettings(
+            devices=args.devices, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+            rate_limit=args.rate_limit, change_rate=args.change_rate,
+        ))
+        runner, url = await start_mock_cloud(cloud, args.host, args.port)
+        print(f"Mock PETLIBRO cloud with {args.devices} devices listening on {url}")
+        try:
+            await AsyncEvent().wait()
+        finally:
+            await runner.cleanup()
+
+    run(serve())
+
+
+if __name__ == "__main__":
+    main()
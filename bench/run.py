@@ -0,0 +1,193 @@
+"""
+Scale benchmark of the PETLIBRO integration against the mock cloud
+
+Drives ``PetLibroHub.load_devices``/``refresh_devices`` for growing fleets and reports, per polling cycle,
+the requests sent, the wall time, the state writes of the entities added to Home Assistant and the peak memory.
+
+    python -m bench.run --devices 1 10 100 1000 --cycles 10 --latency 0.05
+"""
+
+from __future__ import annotations
+
+from argparse import ArgumentParser
+from collections.abc import Mapping
+from asyncio import run, sleep
+from dataclasses import dataclass
+from logging import getLogger
+from datetime import datetime, timedelta
+from statistics import mean
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any
+import tracemalloc
+
+from homeassistant.const import CONF_API_TOKEN, CONF_REGION, EVENT_STATE_CHANGED, EVENT_STATE_REPORTED, Platform
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant import loader
+from homeassistant.helpers import device_registry as dr, entity_registry as er, frame
+from homeassistant.helpers.entity_platform import EntityPlatform
+from homeassistant.util import dt as dt_util
+
+from custom_components.petlibro.api import PetLibroAPI
+from custom_components.petlibro.client import RegionClient
+from custom_components.petlibro.const import CONF_DEDICATED_CONNECTION, DOMAIN
+from custom_components.petlibro.hub import PetLibroHub
+from custom_components.petlibro.sensor import DEVICE_SENSOR_MAP, PetLibroSensorEntity
+from custom_components.petlibro.switch import DEVICE_SWITCH_MAP, PetLibroSwitchEntity
+
+from .mock_cloud import MockCloud, MockSettings, start_mock_cloud
+
+
+@dataclass
+class CycleResult:
+    """Measures of a polling cycle."""
+
+    requests: int
+    errors: int
+    wall_time: float
+    state_writes: int
+
+
+class SimulatedClock:
+    """Replace the integration clock so each cycle happens when the coordinator would have run it."""
+
+    def __init__(self) -> None:
+        self.now = dt_util.utcnow()
+        self._utcnow = dt_util.utcnow
+
+    def __enter__(self) -> SimulatedClock:
+        dt_util.utcnow = lambda: self.now  # type: ignore[assignment]
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        dt_util.utcnow = self._utcnow  # type: ignore[assignment]
+
+    def advance(self, delta: timedelta | None) -> datetime:
+        self.now += delta or timedelta()
+        return self.now
+
+
+async def add_entities(hass: HomeAssistant, hub: PetLibroHub) -> list[int]:
+    """Add the sensor and switch entities of the hub devices to Home Assistant and count the states they write."""
+    await er.async_load(hass)
+    await dr.async_load(hass)
+    for domain, device_map, entity_type in (
+        (Platform.SENSOR, DEVICE_SENSOR_MAP, PetLibroSensorEntity),
+        (Platform.SWITCH, DEVICE_SWITCH_MAP, PetLibroSwitchEntity),
+    ):
+        platform = EntityPlatform(
+            hass=hass, logger=getLogger(__name__), domain=domain, platform_name=DOMAIN, platform=None,
+            scan_interval=timedelta(0), entity_namespace=None
+        )
+        await platform.async_add_entities([
+            entity_type(device, hub, description)
+            for device_type, descriptions in device_map.items()
+            for device in hub.devices.of_type(device_type)
+            for description in descriptions
+        ])
+
+    writes = [0]
+
+    @callback
+    def write(_: Event) -> None:
+        writes[0] += 1
+
+    @callback
+    def any_entity(_: Mapping[str, Any]) -> bool:
+        return True
+
+    # Unchanged states written again are reported instead of changed
+    hass.bus.async_listen(EVENT_STATE_CHANGED, write)
+    hass.bus.async_listen(EVENT_STATE_REPORTED, write, any_entity)
+    return writes
+
+
+async def bench(devices: int, cycles: int, settings: MockSettings, rate: float, burst: int,
+                max_in_flight: int) -> tuple[CycleResult, list[CycleResult], int]:
+    """
+    Benchmark a fleet
+
+    :param rate: Client requests per second
+    :param burst: Client requests burst
+    :param max_in_flight: Client requests in flight
+    :return: The initial load measures, each refresh cycle measures and the peak memory in bytes
+    """
+    settings.devices = devices
+    cloud = MockCloud(settings)
+    runner, url = await start_mock_cloud(cloud)
+    PetLibroAPI.API_URLS["US"] = url
+
+    with TemporaryDirectory() as config_dir, SimulatedClock() as clock:
+        hass = HomeAssistant(config_dir)
+        frame.async_setup(hass)
+        loader.async_setup(hass)
+        hub = PetLibroHub(
+            hass, {CONF_REGION: "US", CONF_API_TOKEN: "mock-token"}, {CONF_DEDICATED_CONNECTION: True},
+            client=RegionClient(hass, "US", rate, burst, max_in_flight)
+        )
+
+        tracemalloc.start()
+        try:
+            start = perf_counter()
+            await hub.load_devices()
+            load = CycleResult(sum(cloud.requests.values()), sum(cloud.errors.values()), perf_counter() - start, 0)
+            writes = await add_entities(hass, hub)
+
+            results = []
+            for _ in range(cycles):
+                cloud.reset_counters()
+                writes[0] = 0
+                hub.api.cache.clear()  # The cache TTLs run on real time, the cycles on simulated time
+                clock.advance(hub.coordinator.update_interval)
+
+                start = perf_counter()
+                await hub.refresh_devices()
+                await sleep(0)  # Run the coalesced state writes
+                await hass.async_block_till_done()
+                results.append(CycleResult(
+                    sum(cloud.requests.values()), sum(cloud.errors.values()), perf_counter() - start, writes[0]
+                ))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            await hub.async_close()
+            await runner.cleanup()
+            await hass.async_stop(force=True)
+
+    return load, results, peak
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--cycles", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--server-rate-limit", type=float, default=None)
+    parser.add_argument("--change-rate", type=float, default=0.1)
+    parser.add_argument("--rate", type=float, default=1000, help="Client requests per second")
+    parser.add_argument("--burst", type=int, default=100, help="Client requests burst")
+    parser.add_argument("--max-in-flight", type=int, default=32, help="Client requests in flight")
+    args = parser.parse_args()
+
+    print(f"{'devices':>8} {'load req':>9} {'load s':>8} {'req/cycle':>10} {'err/cycle':>10} "
+          f"{'cycle s':>8} {'writes/cycle':>13} {'peak MiB':>9}")
+    for devices in args.devices:
+        settings = MockSettings(
+            latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+            rate_limit=args.server_rate_limit, change_rate=args.change_rate,
+        )
+        load, results, peak = run(bench(devices, args.cycles, settings, args.rate, args.burst, args.max_in_flight))
+        print(
+            f"{devices:>8} {load.requests:>9} {load.wall_time:>8.3f} "
+            f"{mean(r.requests for r in results) if results else 0:>10.1f} "
+            f"{mean(r.errors for r in results) if results else 0:>10.1f} "
+            f"{mean(r.wall_time for r in results) if results else 0:>8.3f} "
+            f"{mean(r.state_writes for r in results) if results else 0:>13.1f} "
+            f"{peak / 2 ** 20:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
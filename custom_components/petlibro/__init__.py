@@ -1,20 +1,45 @@
-from homeassistant.core import HomeAssistant
-from homeassistant.const import Platform
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.exceptions import ConfigEntryAuthFailed
+from datetime import datetime
+from logging import getLogger
+
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.const import CONF_REGION, Platform
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv, device_registry as dr
 from homeassistant.helpers.device_registry import DeviceEntry
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.typing import ConfigType
 
 from custom_components.petlibro.devices.feeders.feeder import Feeder
 
-from .devices import Device
+from .devices import Device, DeviceIndex
+from .devices.event import EVENT_FEED, EVENT_FEEDING_RECORDS, EVENT_UPDATE
+from .devices.feeders.models import FeedingRecord
 from .devices.feeders.granary_feeder import GranaryFeeder
-from .const import DOMAIN
+from .client import async_get_region_client
+from .const import (
+    DISCOVERY_INTERVAL, DOMAIN, EVENT_FEEDING, SERVICE_DISCOVER_DEVICES, SIGNAL_DEVICES_ADDED, STORAGE_VERSION
+)
+from .exceptions import PetLibroAPIError, PetLibroCannotConnect
 from .hub import PetLibroHub
+from .statistics import (
+    FeedingStatistics, async_get_import_cursors, async_remove_import_cursors, statistic_ids
+)
+
+_LOGGER = getLogger(__name__)
 
 type PetLibroHubConfigEntry = ConfigEntry[PetLibroHub]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+HUB_PLATFORMS = (
+    Platform.SENSOR,
+)
 PLATFORMS_BY_TYPE = {
     Feeder: (
+        Platform.SENSOR,
         Platform.SWITCH,
     ),
     GranaryFeeder: (
@@ -23,34 +48,188 @@ PLATFORMS_BY_TYPE = {
 }
 
 
-def get_platforms_for_devices(devices: list[Device]) -> set[Platform]:
-    """Get platforms for devices."""
-    return {
+def get_platforms_for_devices(devices: DeviceIndex) -> set[Platform]:
+    """Get platforms for devices and the hub."""
+    return set(HUB_PLATFORMS) | {
         platform
-        for device in devices
         for device_type, platforms in PLATFORMS_BY_TYPE.items()
-        if isinstance(device, device_type)
+        if devices.of_type(device_type)
         for platform in platforms
     }
 
 
+async def async_setup(hass: HomeAssistant, _: ConfigType) -> bool:
+    """Set up the PETLIBRO services."""
+    async def discover_devices(_: ServiceCall) -> None:
+        """Discover the devices added or removed from every PETLIBRO account."""
+        for entry in hass.config_entries.async_entries(DOMAIN):
+            if entry.state is not ConfigEntryState.LOADED:
+                continue
+            try:
+                await async_discover_devices(hass, entry)
+            except ConfigEntryAuthFailed as ex:
+                _LOGGER.warning("Unable to discover the %s devices, authentication failed: %s", entry.title, ex)
+                entry.async_start_reauth(hass)
+
+    hass.services.async_register(DOMAIN, SERVICE_DISCOVER_DEVICES, discover_devices)
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: PetLibroHubConfigEntry) -> bool:
     """Set up platform from a ConfigEntry."""
-    hub = PetLibroHub(hass, entry.data)
+    hub = PetLibroHub(
+        hass, entry.data, entry.options, get_store(hass, entry), async_get_region_client(hass, entry.data[CONF_REGION])
+    )
 
-    await hub.load_devices()
+    # Only list the devices and restore their last known state,
+    # their data is fetched in the background once the entities are set up
+    try:
+        await hub.load_devices(refresh=False)
+        await hub.restore_snapshot()
+    except PetLibroCannotConnect as ex:
+        await hub.async_close()
+        raise ConfigEntryNotReady(ex) from ex
+    except Exception:
+        await hub.async_close()
+        raise
 
     entry.runtime_data = hub
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    for device in hub.devices:
+        async_track_device_info(hass, entry, device)
+        async_track_feeding(hass, entry, device)
+        async_track_feeding_statistics(hass, entry, device)
 
-    if platforms := get_platforms_for_devices(hub.devices):
-        await hass.config_entries.async_forward_entry_setups(entry, platforms)
+    hub.platforms = get_platforms_for_devices(hub.devices)
+    await hass.config_entries.async_forward_entry_setups(entry, hub.platforms)
+    entry.async_create_background_task(hass, hub.first_refresh(), f"{DOMAIN} first refresh")
+
+    async def discover_devices(_: datetime) -> None:
+        try:
+            await async_discover_devices(hass, entry)
+        except ConfigEntryAuthFailed as ex:
+            _LOGGER.warning("Unable to discover the PETLIBRO devices, authentication failed: %s", ex)
+            entry.async_start_reauth(hass)
+        except PetLibroAPIError as ex:
+            _LOGGER.warning("Unable to discover the PETLIBRO devices: %s", ex)
+
+    entry.async_on_unload(async_track_time_interval(
+        hass, discover_devices, DISCOVERY_INTERVAL, name=f"{DOMAIN} devices discovery", cancel_on_shutdown=True
+    ))
     return True
 
 
+async def async_discover_devices(hass: HomeAssistant, entry: PetLibroHubConfigEntry) -> None:
+    """
+    Pick up the devices added or removed from the account since setup, without reloading the entry.
+
+    Entities are added for the new devices only, the vanished devices are removed from the device registry
+    with their entities.
+    """
+    hub = entry.runtime_data
+    async with hub.discovery_lock:
+        added, removed = await hub.discover_devices()
+
+        registry = dr.async_get(hass)
+        for device in removed:
+            _LOGGER.info("PETLIBRO device %s removed from the account", device.serial)
+            if device_entry := registry.async_get_device(identifiers={(DOMAIN, device.serial)}):
+                registry.async_update_device(device_entry.id, remove_config_entry_id=entry.entry_id)
+            if isinstance(device, Feeder):
+                await async_get_import_cursors(hass, entry).async_remove(statistic_ids(device.serial))
+
+        if not added:
+            return
+        for device in added:
+            _LOGGER.info("PETLIBRO device %s added to the account", device.serial)
+            async_track_device_info(hass, entry, device)
+            async_track_feeding(hass, entry, device)
+            async_track_feeding_statistics(hass, entry, device)
+
+        # Platforms already set up add the new devices entities, the others add them on setup
+        async_dispatcher_send(hass, SIGNAL_DEVICES_ADDED.format(entry.entry_id), DeviceIndex(added))
+        if new_platforms := get_platforms_for_devices(hub.devices) - hub.platforms:
+            hub.platforms |= new_platforms
+            await hass.config_entries.async_forward_entry_setups(entry, new_platforms)
+
+        # Only fetched once listened to, the first feeding records fetch backfills the statistics
+        await hub.refresh_added_devices(added)
+
+
+def async_track_device_info(hass: HomeAssistant, entry: PetLibroHubConfigEntry, device: Device) -> None:
+    """Update the device registry once the device details are fetched."""
+    def update(_changed_keys: set[str]) -> None:
+        registry = dr.async_get(hass)
+        if device_entry := registry.async_get_device(identifiers={(DOMAIN, device.serial)}):
+            registry.async_update_device(
+                device_entry.id,
+                model=device.model,
+                name=device.name,
+                sw_version=device.software_version,
+                hw_version=device.hardware_version
+            )
+
+    entry.async_on_unload(device.on(
+        EVENT_UPDATE, update,
+        ("baseInfo.model", "baseInfo.name", "baseInfo.software_version", "baseInfo.hardware_version")
+    ))
+
+
+def async_track_feeding(hass: HomeAssistant, entry: PetLibroHubConfigEntry, device: Device) -> None:
+    """Fire a Home Assistant event for each new feed of a feeder."""
+    if not isinstance(device, Feeder):
+        return
+
+    def feed(record: FeedingRecord) -> None:
+        device_entry = dr.async_get(hass).async_get_device(identifiers={(DOMAIN, device.serial)})
+        hass.bus.async_fire(EVENT_FEEDING, {
+            "device_id": device_entry.id if device_entry else None,
+            "name": device.name,
+            "time": record.time.isoformat(),
+            "portions": record.portions,
+            "quantity": record.quantity,
+            "unit": device.unit_type,
+        })
+
+    entry.async_on_unload(device.on(EVENT_FEED, feed))
+
+
+def async_track_feeding_statistics(hass: HomeAssistant, entry: PetLibroHubConfigEntry, device: Device) -> None:
+    """Import the feeding records of a feeder into the long-term statistics."""
+    if not isinstance(device, Feeder) or "recorder" not in hass.config.components:
+        return
+
+    statistics = FeedingStatistics(hass, entry, device)
+
+    def records(feeding_records: list[FeedingRecord]) -> None:
+        entry.async_create_background_task(
+            hass, statistics.async_import(feeding_records), f"{DOMAIN} {device.serial} feeding statistics"
+        )
+
+    entry.async_on_unload(device.on(EVENT_FEEDING_RECORDS, records))
+
+
+def get_store(hass: HomeAssistant, entry: ConfigEntry) -> Store[dict]:
+    """Get the devices snapshot store of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}")
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: PetLibroHubConfigEntry) -> None:
+    """Reload a config entry when its options changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: PetLibroHubConfigEntry) -> bool:
     """Unload a config entry."""
-    platforms = get_platforms_for_devices(entry.runtime_data.devices)
-    return await hass.config_entries.async_unload_platforms(entry, platforms)
+    if unloaded := await hass.config_entries.async_unload_platforms(entry, entry.runtime_data.platforms):
+        await entry.runtime_data.async_close()
+    return unloaded
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: PetLibroHubConfigEntry) -> None:
+    """Remove the devices snapshot and the statistics import cursors of a removed config entry."""
+    await get_store(hass, entry).async_remove()
+    await async_remove_import_cursors(hass, entry)
 
 
 async def async_remove_config_entry_device(_: HomeAssistant, entry: PetLibroHubConfigEntry,
@@ -60,6 +239,5 @@ async def async_remove_config_entry_device(_: HomeAssistant, entry: PetLibroHubC
         identifier
         for identifier in device_entry.identifiers
         if identifier[0] == DOMAIN
-        for device in entry.runtime_data.devices
-        if device.serial == identifier[1]
+        if identifier[1] == entry.entry_id or identifier[1] in entry.runtime_data.devices
     )
@@ -1,34 +1,175 @@
 "Standalone PETLIBRO API"
-from logging import getLogger
+from asyncio import Future, ensure_future, shield, sleep
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Collection, Iterable
+from json import dumps
+from logging import DEBUG, getLogger
 from hashlib import md5
+from time import monotonic
 from urllib.parse import urljoin
 from typing import Any, Dict, List, TypeAlias
+from datetime import datetime
 
-from aiohttp import ClientSession
+from aiohttp import ClientError, ClientSession, ClientTimeout
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import JSON_DECODE_EXCEPTIONS, json_loads
 
-from .exceptions import PetLibroAPIError, PetLibroInvalidAuth
+from .exceptions import PetLibroAPIError, PetLibroCannotConnect
+from .limiter import PRIORITY_COMMAND, PRIORITY_POLL, RequestLimiter
+from .metrics import RequestMetrics
+from .retry import CircuitBreaker, RetryPolicy, error_for_code, error_for_status, is_transient
 
 
 JSON: TypeAlias = dict[str, "JSON"] | list["JSON"] | str | int | float | bool | None
 _LOGGER = getLogger(__name__)
 
+DEFAULT_TIMEOUT = ClientTimeout(total=20, connect=5, sock_read=10)
+ENDPOINT_TIMEOUTS = {
+    "/member/auth/login": ClientTimeout(total=30, connect=10, sock_read=20),
+    "/device/device/list": ClientTimeout(total=30, connect=5, sock_read=20),
+}
+"""Requests timeouts by path, DEFAULT_TIMEOUT for the others."""
+DEBUG_PAYLOAD_LIMIT = 512
+"""Bytes of a response body written to the debug log, the rest is truncated."""
+DEBUG_SAMPLE_INTERVAL = 60
+"""Seconds between two response bodies of the same path written to the debug log."""
+FEEDING_RECORDS_PAGE_SIZE = 50
+"""Feeding records fetched per request."""
+FEEDING_RECORD_TYPES = ["GRAIN_OUTPUT_SUCCESS"]
+
+
+def request_timeout(total: float) -> ClientTimeout:
+    """Build a requests timeout from its total, the connection and read timeouts can't exceed it."""
+    return ClientTimeout(
+        total=total,
+        connect=min(DEFAULT_TIMEOUT.connect or total, total),
+        sock_read=min(DEFAULT_TIMEOUT.sock_read or total, total)
+    )
+
+
+def project(data: JSON, keys: Collection[str]) -> JSON:
+    """
+    Keep only some keys of a response data
+
+    :param data: The response data, an object or a list of objects
+    :param keys: The keys to keep
+    :return: The projected data, unchanged if neither an object nor a list
+    """
+    if isinstance(data, dict):
+        return {key: value for key, value in data.items() if key in keys}
+    if isinstance(data, list):
+        return [project(item, keys) if isinstance(item, dict) else item for item in data]
+    return data
+
 
 class PetLibroSession:
     """PetLibro AIOHTTP session"""
-    def __init__(self, base_url: str, websession: ClientSession, token : str | None = None):
+    def __init__(self, base_url: str, websession: ClientSession, token : str | None = None,
+                 limiter: RequestLimiter | None = None, retry: RetryPolicy | None = None,
+                 breaker: CircuitBreaker | None = None, timeout: ClientTimeout = DEFAULT_TIMEOUT,
+                 timeouts: Dict[str, ClientTimeout] | None = None, metrics: RequestMetrics | None = None):
         self.base_url = base_url
         self.websession = websession
         self.token = token
+        self.limiter = limiter or RequestLimiter()
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.timeout = timeout
+        self.timeouts = ENDPOINT_TIMEOUTS if timeouts is None else timeouts
+        self.metrics = metrics or RequestMetrics()
         self.headers = {
             "source": "ANDROID",
             "language": "EN",
             "timezone": "Europe/Paris",
             "version": "1.3.45",
         }
+        self._in_flight: Dict[tuple[str, str, str], Future[JSON]] = {}
+        self._debug_logged: Dict[str, float] = {}
+
+    async def request(self, method: str, url: str, priority: int = PRIORITY_POLL,
+                      projection: Collection[str] | None = None, coalesce: bool = True, **kwargs: Any) -> JSON:
+        """
+        Make a request.
+
+        Identical requests (same method, path and JSON body) made while one is in flight share its result
+        instead of sending a new one.
+        Requests go through the rate limiter, by priority.
+
+        :param projection: Only keep these keys of the response data (or of its items if it is a list)
+        :param coalesce: Share the result of an identical request in flight, ``False`` to always send a new one,
+            e.g. to read back a change made after the request in flight started
+        """
+        if not coalesce:
+            data = await self._request(method, url, priority, **kwargs)
+            return project(data, projection) if projection is not None else data
+
+        key = (method, url, dumps(kwargs.get("json", {}), sort_keys=True, default=str))
+        if (flight := self._in_flight.get(key)) is None:
+            flight = self._in_flight[key] = ensure_future(self._request(method, url, priority, **kwargs))
+            if projection is not None:
+                flight = self._in_flight[key] = ensure_future(self._project(flight, projection))
+
+            def done(_: Future[JSON]) -> None:
+                if self._in_flight.get(key) is flight:
+                    del self._in_flight[key]
+
+            flight.add_done_callback(done)
+        else:
+            _LOGGER.debug("Joining in flight %s request to %s", method, url)
 
-    async def request(self, method: str, url: str, **kwargs: Any) -> JSON:
-        """Make a request."""
+        # A cancelled caller must not cancel the request of the others
+        return await shield(flight)
+
+    @staticmethod
+    async def _project(response: Awaitable[JSON], keys: Collection[str]) -> JSON:
+        """Project a response data once received."""
+        return project(await response, keys)
+
+    async def _request(self, method: str, url: str, priority: int, **kwargs: Any) -> JSON:
+        """
+        Send a request once the rate limiter allows it.
+
+        Transient failures are retried with backoff while the circuit breaker is closed.
+        """
+        attempt = 1
+        while True:
+            self.breaker.before_request()
+            try:
+                async with self.limiter.slot(priority):
+                    data = await self._send(method, url, **kwargs)
+            except (PetLibroAPIError, ConfigEntryAuthFailed) as ex:
+                if not is_transient(ex):
+                    # The API answered
+                    self.breaker.record_success()
+                    raise
+
+                self.breaker.record_failure()
+                if attempt >= self.retry.attempts or self.breaker.is_open:
+                    raise
+
+                delay = self.retry.delay(attempt)
+                _LOGGER.debug("%s request to %s failed (%s), retrying in %.1fs", method, url, ex, delay)
+                await sleep(delay)
+                attempt += 1
+            else:
+                self.breaker.record_success()
+                return data
+
+    async def _send(self, method: str, url: str, **kwargs: Any) -> JSON:
+        """Send a request and record its metrics."""
+        start = monotonic()
+        error = None
+        try:
+            return await self._http_request(method, url, **kwargs)
+        except BaseException as ex:
+            error = type(ex).__name__
+            raise
+        finally:
+            self.metrics.observe(url, monotonic() - start, error)
+
+    async def _http_request(self, method: str, url: str, **kwargs: Any) -> JSON:
+        """Send a HTTP request."""
         joined_url = urljoin(self.base_url, url)
         _LOGGER.debug("Making %s request to %s", method, joined_url)
 
@@ -47,30 +188,49 @@ class PetLibroSession:
         if "json" not in kwargs:
             kwargs["json"] = {}
 
-        async with self.websession.request(method, joined_url, **kwargs) as resp:
-            if resp.status != 200:
-                raise PetLibroAPIError(resp.content)
+        # Never let a hung request stall the refresh
+        kwargs.setdefault("timeout", self.timeouts.get(url, self.timeout))
 
-            data = await resp.json()
+        try:
+            async with self.websession.request(method, joined_url, **kwargs) as resp:
+                if resp.status != 200:
+                    raise error_for_status(resp.status, resp.reason)
 
-            _LOGGER.debug(
-                "Received %s response from %s: %s", resp.status, joined_url, data
-            )
+                body = await resp.read()
+        except (ClientError, TimeoutError) as ex:
+            # Connection errors and timeouts are transient
+            raise PetLibroCannotConnect(f"{type(ex).__name__}: {ex}") from ex
 
-            if not data:
-                raise PetLibroAPIError("No JSON data")
+        if _LOGGER.isEnabledFor(DEBUG):
+            self._log_body(url, resp.status, joined_url, body)
 
-            if data.get("code") == 1102:
-                raise PetLibroInvalidAuth()
+        try:
+            data = json_loads(body) if body else None
+        except JSON_DECODE_EXCEPTIONS as ex:
+            raise PetLibroAPIError(f"Invalid JSON data: {ex}") from ex
 
-            if data.get("code") == 1009:
-                raise ConfigEntryAuthFailed(data.get("msg"))
+        if not data or not isinstance(data, dict):
+            raise PetLibroAPIError("No JSON data")
 
-            # Catch all other non 0 code
-            if data.get("code") != 0:
-                raise PetLibroAPIError(f"Code: {data.get('code')}, Message: {data.get('msg')}")
+        # Catch all non 0 code
+        if data.get("code") != 0:
+            raise error_for_code(data.get("code"), data.get("msg"))
 
-            return data.get("data")
+        return data.get("data")
+
+    def _log_body(self, path: str, status: int, url: str, body: bytes) -> None:
+        """Log a truncated response body, at most once per path every DEBUG_SAMPLE_INTERVAL."""
+        now = monotonic()
+        if now - self._debug_logged.get(path, -DEBUG_SAMPLE_INTERVAL) < DEBUG_SAMPLE_INTERVAL:
+            return
+        self._debug_logged[path] = now
+
+        truncated = len(body) > DEBUG_PAYLOAD_LIMIT
+        _LOGGER.debug(
+            "Received %s response from %s: %s%s", status, url,
+            body[:DEBUG_PAYLOAD_LIMIT].decode(errors="replace"),
+            f"... ({len(body)} bytes)" if truncated else ""
+        )
 
     async def post(self, path: str, **kwargs: Any) -> JSON:
         """Post on PetLibro API"""
@@ -83,6 +243,66 @@ class PetLibroSession:
             }, **kwargs)
 
 
+class ResponseCache:
+    """Bounded LRU cache of API responses with a TTL per entry"""
+    def __init__(self, max_size: int = 512):
+        self.max_size = max_size
+        self._entries: OrderedDict[tuple[str, str], tuple[float, JSON]] = OrderedDict()
+        self._invalidations = 0
+        self._generations: Dict[tuple[str, str], int] = {}
+        """Last invalidation by key, responses fetched before an invalidation are not cached."""
+        self._cleared = 0
+
+    def get(self, key: tuple[str, str]) -> tuple[bool, JSON]:
+        """
+        Get a cached response
+
+        :param key: Cache key
+        :return: If the response was found and the response
+        """
+        if (entry := self._entries.get(key)) is None:
+            return False, None
+        if entry[0] <= monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry[1]
+
+    def generation(self, key: tuple[str, str]) -> int:
+        """Get the invalidation generation of a key, to pass to ``set`` once the response is fetched."""
+        return max(self._generations.get(key, 0), self._cleared)
+
+    def set(self, key: tuple[str, str], value: JSON, ttl: float, generation: int | None = None) -> None:
+        """
+        Cache a response
+
+        :param key: Cache key
+        :param value: The response
+        :param ttl: Time to live of the response in seconds
+        :param generation: Generation of the key when the request started, the response is dropped if the key
+            was invalidated since
+        """
+        if generation is not None and generation != self.generation(key):
+            return
+        self._entries[key] = (monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: tuple[str, str]) -> None:
+        """Drop a cached response, the requests in flight for it won't cache theirs."""
+        self._entries.pop(key, None)
+        self._invalidations += 1
+        self._generations[key] = self._invalidations
+
+    def clear(self) -> None:
+        """Drop every cached response, the requests in flight won't cache theirs."""
+        self._entries.clear()
+        self._generations.clear()
+        self._invalidations += 1
+        self._cleared = self._invalidations
+
+
 class PetLibroAPI:
     """Placeholder class to make tests pass.
 
@@ -94,13 +314,66 @@ class PetLibroAPI:
     API_URLS = {
         "US": "https://api.us.petlibro.com"
     }
+    CACHE_TTLS = {
+        "list_devices": 60,
+        "device_base_info": 300,
+        "device_real_info": 15,
+        "device_grain_status": 15,
+        "device_feeding_plan_today_new": 30,
+    }
+    """Time to live in seconds of the cached read endpoints responses."""
+    PROJECTIONS: dict[str, set[str]] = {}
+    """Response keys to keep by read endpoint, registered by the devices models. Kept whole if not registered."""
 
     def __init__(self, session: ClientSession, time_zone: str, region: str,
-                 token: str | None = None) -> None:
-        """Initialize."""
-        self.session = PetLibroSession(self.API_URLS[region], session, token)
+                 token: str | None = None, cache: ResponseCache | None = None,
+                 limiter: RequestLimiter | None = None, breaker: CircuitBreaker | None = None,
+                 metrics: RequestMetrics | None = None, timeout: ClientTimeout = DEFAULT_TIMEOUT,
+                 timeouts: Dict[str, ClientTimeout] | None = None) -> None:
+        """
+        Initialize.
+
+        :param timeout: Requests timeout
+        :param timeouts: Requests timeouts by path, ENDPOINT_TIMEOUTS if not set
+        """
+        self.session = PetLibroSession(
+            self.API_URLS[region], session, token, limiter, breaker=breaker, timeout=timeout, timeouts=timeouts,
+            metrics=metrics
+        )
         self.region = region
         self.time_zone = time_zone
+        self.cache = cache or ResponseCache()
+
+    @classmethod
+    def register_projection(cls, endpoint: str, keys: Iterable[str]) -> None:
+        """
+        Declare response keys used from a read endpoint
+
+        :param endpoint: The endpoint name, from CACHE_TTLS
+        :param keys: The used keys, added to the keys registered by the other models
+        """
+        cls.PROJECTIONS.setdefault(endpoint, set()).update(keys)
+
+    async def _cached(self, endpoint: str, serial: str, fetch: Callable[..., Awaitable[Any]],
+                      fresh: bool = False) -> Any:
+        """
+        Get a read endpoint response from the cache or fetch it
+
+        :param endpoint: The endpoint name, from CACHE_TTLS
+        :param serial: The device serial, the account token for account endpoints
+        :param fetch: Fetch the response on cache miss, called with the ``projection`` and ``coalesce`` request
+            arguments
+        :param fresh: Skip the cache and the identical requests in flight, the response is still cached
+        :return: The response
+        """
+        key = (endpoint, serial)
+        found, data = (False, None) if fresh else self.cache.get(key)
+        if not found:
+            # A setter invalidating the key while the request is in flight makes its response stale
+            generation = self.cache.generation(key)
+            data = await fetch(projection=self.PROJECTIONS.get(endpoint), coalesce=not fresh)
+            self.cache.set(key, data, self.CACHE_TTLS[endpoint], generation)
+        return data
 
     @staticmethod
     def hash_password(password: str) -> str:
@@ -120,7 +393,7 @@ class PetLibroAPI:
         :param password_hash: The account password hash
         :raises PetLibroAPIError: In case of API error
         """
-        data = await self.session.post("/member/auth/login", json={
+        data = await self.session.post("/member/auth/login", priority=PRIORITY_COMMAND, json={
             "appId": self.APPID,
             "appSn": self.APPSN,
             "country": self.region,
@@ -142,38 +415,110 @@ class PetLibroAPI:
         """
         Logout of the API
         """
-        await self.session.post("/member/auth/logout")
+        await self.session.post("/member/auth/logout", priority=PRIORITY_COMMAND)
         self.session.token = None
 
-    async def list_devices(self) -> List[dict]:
+    async def list_devices(self, fresh: bool = False) -> List[dict]:
         """
         List all account devices
 
+        :param fresh: Skip the cached list
         :raises PetLibroAPIError: In case of API error
         :return: List of devices
         """
-        return await self.session.post("/device/device/list")  # type: ignore
-
-    async def device_base_info(self, serial: str) -> Dict[str, Any]:
-        return await self.session.post_serial("/device/device/baseInfo", serial)  # type: ignore
-
-    async def device_real_info(self, serial: str) -> Dict[str, Any]:
-        return await self.session.post_serial("/device/device/realInfo", serial)  # type: ignore
+        # The cache can be shared between accounts, the devices list is cached by account
+        return await self._cached(
+            "list_devices", self.session.token or "",
+            lambda **kwargs: self.session.post("/device/device/list", **kwargs), fresh
+        )
+
+    def invalidate_devices(self) -> None:
+        """Drop the cached account devices list."""
+        self.cache.invalidate(("list_devices", self.session.token or ""))
+
+    async def device_base_info(self, serial: str, fresh: bool = False) -> Dict[str, Any]:
+        return await self._cached(
+            "device_base_info", serial,
+            lambda **kwargs: self.session.post_serial("/device/device/baseInfo", serial, **kwargs), fresh
+        )
+
+    async def device_real_info(self, serial: str, fresh: bool = False) -> Dict[str, Any]:
+        return await self._cached(
+            "device_real_info", serial,
+            lambda **kwargs: self.session.post_serial("/device/device/realInfo", serial, **kwargs), fresh
+        )
+
+    async def device_grain_status(self, serial: str, fresh: bool = False) -> Dict[str, Any]:
+        return await self._cached(
+            "device_grain_status", serial,
+            lambda **kwargs: self.session.post_serial("/device/data/grainStatus", serial, **kwargs), fresh
+        )
+
+    async def device_feeding_plan_today_new(self, serial: str, fresh: bool = False) -> Dict[str, Any]:
+        return await self._cached(
+            "device_feeding_plan_today_new", serial,
+            lambda **kwargs: self.session.post_serial("/device/feedingPlan/todayNew", serial, **kwargs), fresh
+        )
+
+    async def device_feeding_records(self, serial: str, since: datetime) -> List[dict]:
+        """
+        List the device feeding records newer than a time
 
-    async def device_grain_status(self, serial: str) -> Dict[str, Any]:
-        return await self.session.post_serial("/device/data/grainStatus", serial)  # type: ignore
+        Only the new records are fetched, page by page, instead of the day history. Pages may list the records
+        oldest or newest first.
 
-    async def device_feeding_plan_today_new(self, serial: str) -> Dict[str, Any]:
-        return await self.session.post_serial("/device/feedingPlan/todayNew", serial)  # type: ignore
+        :param serial: The device serial
+        :param since: Time of the oldest record to fetch
+        :raises PetLibroAPIError: In case of API error
+        :return: The feeding records, oldest first
+        """
+        records: list[dict] = []
+        start = int(since.timestamp() * 1000)
+        end = int(dt_util.utcnow().timestamp() * 1000)
+        while start <= end:
+            data = await self.session.post("/device/workRecord/list", json={
+                "deviceSn": serial,
+                "startTime": start,
+                "endTime": end,
+                "size": FEEDING_RECORDS_PAGE_SIZE,
+                "type": FEEDING_RECORD_TYPES,
+            })
+            # Records are grouped by day
+            days = data if isinstance(data, list) else []
+            page = [
+                record
+                for day in days
+                if isinstance(day, dict)
+                for record in day.get("workRecords") or []
+                if isinstance(record, dict) and isinstance(record.get("recordTime"), int)
+            ]
+            records.extend(page)
+            if len(page) < FEEDING_RECORDS_PAGE_SIZE:
+                break
+            # A full page holds the oldest or the newest records of the window depending on the listing order,
+            # the window is narrowed past the fetched end
+            times = [record["recordTime"] for record in page]
+            if times[0] > times[-1]:
+                end = min(times) - 1
+            else:
+                start = max(times) + 1
+
+        return sorted(records, key=lambda record: record["recordTime"])
 
     async def set_device_feeding_plan(self, serial: str, enable: bool):
-        await self.session.post("/device/setting/updateFeedingPlanSwitch", json={
-            "deviceSn": serial,
-            "enable": enable
-        })
+        try:
+            await self.session.post("/device/setting/updateFeedingPlanSwitch", priority=PRIORITY_COMMAND, json={
+                "deviceSn": serial,
+                "enable": enable
+            })
+        finally:
+            self.cache.invalidate(("device_real_info", serial))
 
     async def set_device_feeding_plan_today_all(self, serial: str, enable: bool):
-        return await self.session.post("/device/feedingPlan/enableTodayAll", json={
-            "deviceSn": serial,
-            "enable": enable
-        })
+        try:
+            return await self.session.post("/device/feedingPlan/enableTodayAll", priority=PRIORITY_COMMAND, json={
+                "deviceSn": serial,
+                "enable": enable
+            })
+        finally:
+            self.cache.invalidate(("device_feeding_plan_today_new", serial))
@@ -0,0 +1,145 @@
+"""PETLIBRO API clients shared by the config entries of a region."""
+
+from __future__ import annotations
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.json import json_dumps
+from homeassistant.util.hass_dict import HassKey
+
+from .api import DEFAULT_TIMEOUT, PetLibroAPI, ResponseCache
+from .const import DOMAIN
+from .limiter import DEFAULT_BURST, DEFAULT_MAX_IN_FLIGHT, DEFAULT_RATE, RequestLimiter
+from .metrics import RequestMetrics
+from .retry import CircuitBreaker
+
+DATA_CLIENTS: HassKey[dict[str, RegionClient]] = HassKey(f"{DOMAIN}_clients")
+
+DEDICATED_CONNECTION_LIMIT = 8
+"""Connections kept to the PETLIBRO API when using a dedicated connection pool."""
+DEDICATED_DNS_CACHE_SECONDS = 60 * 10
+DEDICATED_KEEPALIVE_SECONDS = 60 * 5
+"""Keep the connections alive between the polling cycles to avoid a new TLS handshake each time."""
+
+STAGGER_SLOTS = 5
+"""Polling phases the entries of a region are spread over."""
+
+
+def create_dedicated_session() -> ClientSession:
+    """Create a session with a connection pool tuned for polling the PETLIBRO API."""
+    return ClientSession(
+        connector=TCPConnector(
+            limit=DEDICATED_CONNECTION_LIMIT,
+            limit_per_host=DEDICATED_CONNECTION_LIMIT,
+            ttl_dns_cache=DEDICATED_DNS_CACHE_SECONDS,
+            keepalive_timeout=DEDICATED_KEEPALIVE_SECONDS,
+        ),
+        json_serialize=json_dumps,
+    )
+
+
+class RegionClient:
+    """
+    Connection pool, rate limiter, circuit breaker, metrics and responses cache of a region
+
+    Every hub of the region goes through the same client, so several accounts polling the same API share its
+    limits instead of each hammering it on their own. Tokens and devices stay per account: each hub gets its own
+    ``PetLibroAPI``.
+    """
+
+    def __init__(self, hass: HomeAssistant, region: str, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST,
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT) -> None:
+        """
+        Init the client
+
+        :param rate: Requests per second allowed on average, unless its users ask for less
+        :param burst: Requests allowed in a burst after being idle
+        :param max_in_flight: Requests allowed at the same time, unless its users ask for less
+        """
+        self.hass = hass
+        self.region = region
+        self.rate = rate
+        self.max_in_flight = max_in_flight
+        self.limiter = RequestLimiter(rate, burst, max_in_flight)
+        self.breaker = CircuitBreaker()
+        self.metrics = RequestMetrics()
+        self.cache = ResponseCache()
+        self.dedicated_session: ClientSession | None = None
+        self._slots: dict[object, int] = {}
+        """Polling phase slot by user."""
+        self._limits: dict[object, tuple[float | None, int | None]] = {}
+        """Requests rate and requests in flight asked by user."""
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def attach(self, user: object, rate: float | None = None, max_in_flight: int | None = None) -> int:
+        """
+        Register a user of the client
+
+        The limiter shared by the users applies the lowest limits they asked for, the client ones if none did.
+
+        :param user: The client user, usually a hub
+        :param rate: Requests per second the user asks for
+        :param max_in_flight: Requests in flight the user asks for
+        :return: The user polling phase slot, the least used one
+        """
+        used = list(self._slots.values())
+        slot = min(range(STAGGER_SLOTS), key=lambda candidate: (used.count(candidate), candidate))
+        self._slots[user] = slot
+        self._limits[user] = (rate, max_in_flight)
+        self._apply_limits()
+        return slot
+
+    def _apply_limits(self) -> None:
+        """Configure the limiter with the lowest limits asked by the users."""
+        rates = [rate for rate, _ in self._limits.values() if rate is not None]
+        in_flight = [max_in_flight for _, max_in_flight in self._limits.values() if max_in_flight is not None]
+        self.limiter.configure(
+            min(rates, default=self.rate), self.limiter.burst, min(in_flight, default=self.max_in_flight)
+        )
+
+    async def detach(self, user: object) -> None:
+        """Unregister a user of the client, the client is closed and forgotten once it has no users left."""
+        self._slots.pop(user, None)
+        self._limits.pop(user, None)
+        if self._slots:
+            self._apply_limits()
+            return
+
+        if self.dedicated_session is not None:
+            await self.dedicated_session.close()
+            self.dedicated_session = None
+        if (clients := self.hass.data.get(DATA_CLIENTS)) is not None and clients.get(self.region) is self:
+            del clients[self.region]
+
+    def create_api(self, token: str, dedicated: bool = False, timeout: ClientTimeout = DEFAULT_TIMEOUT,
+                   timeouts: dict[str, ClientTimeout] | None = None) -> PetLibroAPI:
+        """
+        Create an account API going through the shared client
+
+        :param token: The account token
+        :param dedicated: Use the region dedicated connection pool instead of the Home Assistant one
+        :param timeout: The account requests timeout
+        :param timeouts: The account requests timeouts by path, the API ones if not set
+        """
+        if dedicated:
+            if self.dedicated_session is None:
+                self.dedicated_session = create_dedicated_session()
+            websession = self.dedicated_session
+        else:
+            websession = async_get_clientsession(self.hass)
+
+        return PetLibroAPI(
+            websession, self.hass.config.time_zone, self.region, token, self.cache, self.limiter, self.breaker,
+            self.metrics, timeout, timeouts
+        )
+
+
+def async_get_region_client(hass: HomeAssistant, region: str) -> RegionClient:
+    """Get the shared client of a region, created on first use."""
+    clients = hass.data.setdefault(DATA_CLIENTS, {})
+    if (client := clients.get(region)) is None:
+        client = clients[region] = RegionClient(hass, region)
+    return client
@@ -7,13 +7,18 @@ from typing import Any, Mapping
 
 import voluptuous as vol
 
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import ConfigEntry, ConfigFlow, ConfigFlowResult, OptionsFlow
 from homeassistant.const import CONF_REGION, CONF_EMAIL, CONF_PASSWORD, CONF_API_TOKEN
+from homeassistant.core import callback
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN, CONF_DEDICATED_CONNECTION, CONF_MAX_IN_FLIGHT, CONF_REQUEST_RATE, CONF_REQUEST_TIMEOUT, CONF_STALE_AFTER,
+    DEFAULT_REQUEST_TIMEOUT, DEFAULT_STALE_AFTER
+)
 from .api import PetLibroAPI
 from .exceptions import PetLibroCannotConnect, PetLibroInvalidAuth
+from .limiter import DEFAULT_MAX_IN_FLIGHT, DEFAULT_RATE
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,6 +40,12 @@ class PetlibroConfigFlow(ConfigFlow, domain=DOMAIN):
     email: str
     region: str
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> PetlibroOptionsFlow:
+        """Get the options flow for this handler."""
+        return PetlibroOptionsFlow(config_entry)
+
     async def async_step_user(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
         """Handle the initial step."""
         errors: dict[str, str] = {}
@@ -103,3 +114,44 @@ class PetlibroConfigFlow(ConfigFlow, domain=DOMAIN):
             _LOGGER.exception("Unexpected exception: %s", e)
             return "unknown"
         return ""
+
+
+class PetlibroOptionsFlow(OptionsFlow):
+    """Handle the Petlibro options."""
+
+    def __init__(self, config_entry: ConfigEntry) -> None:
+        """Initialize options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_DEDICATED_CONNECTION,
+                        default=self._entry.options.get(CONF_DEDICATED_CONNECTION, False)
+                    ): bool,
+                    vol.Optional(
+                        CONF_STALE_AFTER,
+                        default=self._entry.options.get(CONF_STALE_AFTER, DEFAULT_STALE_AFTER)
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    vol.Optional(
+                        CONF_REQUEST_RATE,
+                        default=self._entry.options.get(CONF_REQUEST_RATE, DEFAULT_RATE)
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0.1)),
+                    vol.Optional(
+                        CONF_MAX_IN_FLIGHT,
+                        default=self._entry.options.get(CONF_MAX_IN_FLIGHT, DEFAULT_MAX_IN_FLIGHT)
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    vol.Optional(
+                        CONF_REQUEST_TIMEOUT,
+                        default=self._entry.options.get(CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT)
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                }
+            ),
+        )
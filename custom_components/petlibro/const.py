@@ -1 +1,38 @@
+from datetime import timedelta
+
 DOMAIN = "petlibro"
+
+STORAGE_VERSION = 1
+
+SERVICE_DISCOVER_DEVICES = "discover_devices"
+EVENT_FEEDING = f"{DOMAIN}_feeding"
+"""Home Assistant event fired for each new feed of a feeder."""
+SIGNAL_DEVICES_ADDED = f"{DOMAIN}_devices_added_{{}}"
+"""Dispatcher signal sent with the devices discovered after setup, formatted with the config entry ID."""
+DISCOVERY_INTERVAL = timedelta(minutes=30)
+"""Interval between two discoveries of the account devices."""
+
+CONF_DEDICATED_CONNECTION = "dedicated_connection"
+CONF_STALE_AFTER = "stale_after"
+DEFAULT_STALE_AFTER = 30
+"""Minutes a failing device keeps its last known values before being unavailable."""
+CONF_REQUEST_RATE = "request_rate"
+"""Requests per second to the PETLIBRO cloud, shared by the entries of a region."""
+CONF_MAX_IN_FLIGHT = "max_in_flight"
+"""Requests in flight to the PETLIBRO cloud, shared by the entries of a region."""
+CONF_REQUEST_TIMEOUT = "request_timeout"
+DEFAULT_REQUEST_TIMEOUT = 20
+"""Seconds before a request to the PETLIBRO cloud is abandoned, the login and devices list excepted."""
+
+# Polling tiers of the devices endpoints
+POLL_INTERVAL_STATIC = timedelta(hours=6)
+"""Device metadata that almost never change (name, firmware, MAC...)."""
+POLL_INTERVAL_SLOW = timedelta(minutes=10)
+"""Device settings and plans, changed from the app or the integration."""
+POLL_INTERVAL_LIVE = timedelta(minutes=2)
+"""Live device state."""
+POLL_INTERVAL_IDLE = timedelta(minutes=15)
+"""Feeding state between two planned feeds."""
+
+FEEDING_REFRESH_DELAY = timedelta(minutes=1)
+"""Delay after a planned feed before refreshing the feeding state."""
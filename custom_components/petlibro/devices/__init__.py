@@ -1,5 +1,6 @@
 from typing import Dict, Type
 from .device import Device
+from .index import DeviceIndex
 from .feeders.granary_feeder import GranaryFeeder
 from .feeders.granary_camera_feeder import GranaryCameraFeeder
 
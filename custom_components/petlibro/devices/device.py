@@ -1,57 +1,289 @@
+from asyncio import Task, create_task, gather
+from collections.abc import Awaitable, Callable, Coroutine, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
 from logging import getLogger
-from typing import cast
+from typing import Any, cast
+
+from homeassistant.exceptions import ConfigEntryAuthFailed
 
 from ..api import PetLibroAPI
+from ..const import POLL_INTERVAL_LIVE, POLL_INTERVAL_STATIC
+from ..exceptions import PetLibroAPIError
 from .event import Event, EVENT_UPDATE
+from .models import DeviceInfo, RealInfo, StateModel
 
 
 _LOGGER = getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class Endpoint:
+    """A device API endpoint fetched on refresh."""
+
+    fetch: Callable[..., Awaitable[dict[str, Any]]]
+    """API read method, called with the device serial and ``fresh`` to skip the cache."""
+    model: type[StateModel]
+    """State model the payload is parsed into."""
+    key: str | None = None
+    """Key of the payload in the device snapshot, ``None`` to merge it at the root of the snapshot."""
+    interval: timedelta = POLL_INTERVAL_LIVE
+    """Base polling interval of the endpoint."""
+    project: bool = True
+    """Only keep the keys read by the model from the responses, for the payloads laid out like the model."""
+
+    def __post_init__(self) -> None:
+        if self.project:
+            PetLibroAPI.register_projection(self.fetch.__name__, self.model.FIELDS.values())
+
+
 class Device(Event):
+    ENDPOINTS: dict[str, Endpoint] = {
+        "baseInfo": Endpoint(PetLibroAPI.device_base_info, DeviceInfo, interval=POLL_INTERVAL_STATIC),
+        "realInfo": Endpoint(PetLibroAPI.device_real_info, RealInfo),
+    }
+    INFO_ENDPOINT = "baseInfo"
+    """Endpoint whose state also holds the devices list data."""
+    LIVE_ENDPOINT = "realInfo"
+    """Endpoint whose fields still unknown are filled from the devices list and the info endpoint data."""
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._register_live_fallback()
+
+    @classmethod
+    def _register_live_fallback(cls) -> None:
+        """Keep the live fields in the devices list and the info endpoint responses, they are read as a fallback."""
+        keys = cls.ENDPOINTS[cls.LIVE_ENDPOINT].model.FIELDS.values()
+        PetLibroAPI.register_projection(PetLibroAPI.list_devices.__name__, keys)
+        PetLibroAPI.register_projection(cls.ENDPOINTS[cls.INFO_ENDPOINT].fetch.__name__, keys)
+
     def __init__(self, data: dict, api: PetLibroAPI):
         super().__init__()
-        self._data: dict = {}
+        self._state: dict[str, StateModel] = {}
+        self._batch_depth = 0
+        self._batch_changes: set[str] = set()
+        self.generation = 0
+        """Data generation, increased on every data change."""
+        self._background_tasks: set[Task] = set()
+        self.last_success: datetime | None = None
+        """Time of the last successful refresh."""
+        self.failures = 0
+        """Number of refresh failures since the last success."""
         self.api = api
 
-        self.update_data(data)
+        self._state[self.INFO_ENDPOINT] = self.ENDPOINTS[self.INFO_ENDPOINT].model.parse(data)
+        self._fill_live_state(data)
+
+    def state(self, endpoint: str) -> StateModel | None:
+        """Return the state of an endpoint, ``None`` until it is fetched."""
+        return self._state.get(endpoint)
+
+    def parse(self, endpoint: str, payload: dict[str, Any]) -> StateModel:
+        """Parse an endpoint payload into its state, on top of the current one."""
+        return self.ENDPOINTS[endpoint].model.parse(payload, self._state.get(endpoint))
+
+    def update_state(self, endpoint: str, state: StateModel) -> None:
+        """
+        Save the state of an endpoint, emit an update with the changed keys if any
+
+        Changed keys are the endpoint name and the dotted path of its changed fields (``realInfo.feeding_plan``).
+        """
+        with self.batch_update():
+            if changes := state.diff(self._state.get(endpoint)):
+                self._state[endpoint] = state
+                self._batch_changes |= {endpoint} | {f"{endpoint}.{name}" for name in changes}
+                self.generation += 1
+
+    @contextmanager
+    def batch_update(self) -> Iterator[None]:
+        """
+        Group data updates into a single transaction
+
+        Every ``update_state`` made inside the transaction is collected and a single ``EVENT_UPDATE`` is emitted
+        on exit with all the changed keys, nothing is emitted if the data didn't change.
+        Transactions can be nested, the event is emitted when the outermost one ends.
+        """
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._batch_changes:
+                changes, self._batch_changes = self._batch_changes, set()
+                self.emit(EVENT_UPDATE, keys=changes)
+
+    async def fetch(self, endpoints: Iterable[str] | None = None, fresh: bool = False) -> dict[str, dict[str, Any]]:
+        """
+        Fetch the device endpoints concurrently
+
+        :param endpoints: Names of the endpoints to fetch, all of them if not set
+        :param fresh: Skip the cached responses and the identical requests in flight
+        :return: Payloads by endpoint name
+        """
+        names = list(self.ENDPOINTS if endpoints is None else endpoints)
+        payloads = await gather(*(self.fetch_endpoint(name, fresh) for name in names))
+        return dict(zip(names, payloads))
+
+    async def fetch_endpoint(self, endpoint: str, fresh: bool = False) -> dict[str, Any]:
+        """Fetch an endpoint payload."""
+        return await self.ENDPOINTS[endpoint].fetch(self.api, self.serial, fresh=fresh)
+
+    def apply(self, payloads: dict[str, dict[str, Any]]) -> None:
+        """Parse fetched endpoints payloads into the device state in a single update."""
+        with self.batch_update():
+            for name, payload in payloads.items():
+                self.update_state(name, self.parse(name, payload))
+                if name == self.INFO_ENDPOINT:
+                    self._fill_live_state(payload)
+
+    def _fill_live_state(self, payload: dict[str, Any]) -> None:
+        """
+        Fill the live state fields still unknown from a devices list or info endpoint payload
 
-    def update_data(self, data: dict) -> None:
-        """Save the device info from a data dictionary."""
-        self._data.update(data)
-        self.emit(EVENT_UPDATE)
+        Some live fields, e.g. the feeder unit, may only be reported there. The live endpoint values take precedence.
+        """
+        model = self.ENDPOINTS[self.LIVE_ENDPOINT].model
+        if not (fallback := model.parse(payload)).diff(None):
+            return
+        if (current := self._state.get(self.LIVE_ENDPOINT)) is not None:
+            fallback = model.parse(current.to_payload(), fallback)
+        self.update_state(self.LIVE_ENDPOINT, fallback)
 
-    async def refresh(self):
+    async def refresh(self, endpoints: Iterable[str] | None = None, fresh: bool = False):
         """Refresh the device data from the API."""
-        data = {}
-        data.update(await self.api.device_base_info(self.serial))
-        data.update(await self.api.device_real_info(self.serial))
-        self.update_data(data)
+        self.apply(await self.fetch(endpoints, fresh))
+
+    async def optimistic_update(self, changes: dict[str, Any], request: Coroutine[Any, Any, Any],
+                                endpoint: str) -> None:
+        """
+        Apply a change to the device state before the API confirms it
+
+        The state is updated right away and rolled back if the request fails, only the fields still holding the
+        optimistic value are rolled back so data refreshed in the meantime is kept. Once the request is done the
+        endpoint reflecting the change is re-fetched in the background, its payload replaces the optimistic state.
+
+        :param changes: The expected endpoint state fields values after the change
+        :param request: The API request making the change
+        :param endpoint: Name of the endpoint reflecting the change
+        """
+        current = self._state.get(endpoint) or self.ENDPOINTS[endpoint].model()
+        previous = {name: getattr(current, name) for name in changes}
+        self.update_state(endpoint, replace(current, **changes))
+        try:
+            await request
+        except Exception:
+            if (state := self._state.get(endpoint)) is not None and (rollback := {
+                name: value for name, value in previous.items() if getattr(state, name) == changes[name]
+            }):
+                self.update_state(endpoint, replace(state, **rollback))
+            raise
+
+        task = create_task(self._confirm_update(changes, endpoint))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def cancel_tasks(self) -> None:
+        """Cancel the background tasks of the device, once it is unloaded or removed."""
+        for task in self._background_tasks:
+            task.cancel()
+
+    async def _confirm_update(self, expected: dict[str, Any], endpoint: str) -> None:
+        """Re-fetch the endpoint reflecting an optimistic update."""
+        try:
+            # A read in flight or cached before the update would hold the previous state
+            await self.refresh([endpoint], fresh=True)
+        except ConfigEntryAuthFailed as ex:
+            # The next refresh fails the same way and starts the reauthentication
+            _LOGGER.warning("Unable to confirm %s update, authentication failed: %s", self.serial, ex)
+            return
+        except PetLibroAPIError as ex:
+            # Including the suspended requests when the circuit breaker is open
+            _LOGGER.warning("Unable to confirm %s update: %s", self.serial, ex)
+            return
+
+        state = self._state.get(endpoint)
+        if rejected := [name for name, value in expected.items() if getattr(state, name, None) != value]:
+            _LOGGER.warning("%s rejected the update of %s, rolled back", self.serial, ", ".join(rejected))
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the device state to persist, laid out like the endpoints payloads."""
+        data: dict[str, Any] = {}
+        for name, state in self._state.items():
+            if (key := self.ENDPOINTS[name].key) is None:
+                data.update(state.to_payload())
+            else:
+                data[key] = state.to_payload()
+        return {
+            "data": data,
+            "last_success": self.last_success.isoformat() if self.last_success else None,
+        }
+
+    def restore(self, snapshot: dict[str, Any]) -> None:
+        """Restore a persisted device state, the current state takes precedence."""
+        if last_success := snapshot.get("last_success"):
+            self.last_success = datetime.fromisoformat(last_success)
+
+        data = snapshot.get("data", {})
+        with self.batch_update():
+            for name, endpoint in self.ENDPOINTS.items():
+                if not isinstance(payload := data if endpoint.key is None else data.get(endpoint.key), dict):
+                    continue
+                state = endpoint.model.parse(payload)
+                if (current := self._state.get(name)) is not None:
+                    state = endpoint.model.parse(current.to_payload(), state)
+                self.update_state(name, state)
+
+    def next_refresh(self, endpoint: str, polled: datetime) -> datetime | None:
+        """
+        Request a poll of an endpoint before its regular interval
+
+        :param endpoint: The endpoint name
+        :param polled: Time of the endpoint last poll
+        :return: Time of the requested poll, ``None`` to wait for the regular interval
+        """
+        return None
+
+    @property
+    def info(self) -> DeviceInfo:
+        """The device details."""
+        return cast(DeviceInfo, self._state[self.INFO_ENDPOINT])
+
+    @property
+    def real_info(self) -> RealInfo | None:
+        """The device live state, ``None`` until fetched."""
+        return cast(RealInfo | None, self._state.get("realInfo"))
 
     @property
     def serial(self) -> str:
-        return cast(str, self._data.get("deviceSn"))
+        return cast(str, self.info.serial)
 
     @property
     def model(self) -> str:
-        return cast(str, self._data.get("productIdentifier"))
+        return cast(str, self.info.model)
 
     @property
     def model_name(self) -> str:
-        return cast(str, self._data.get("productName"))
+        return cast(str, self.info.model_name)
 
     @property
     def name(self) -> str:
-        return cast(str, self._data.get("name"))
+        return cast(str, self.info.name)
 
     @property
     def mac(self) -> str:
-        return cast(str, self._data.get("mac"))
+        return cast(str, self.info.mac)
 
     @property
     def software_version(self) -> str:
-        return cast(str, self._data.get("softwareVersion"))
+        return cast(str, self.info.software_version)
 
     @property
     def hardware_version(self) -> str:
-        return cast(str, self._data.get("hardwareVersion"))
+        return cast(str, self.info.hardware_version)
+
+
+# The devices list is parsed into the devices info too
+PetLibroAPI.register_projection(PetLibroAPI.list_devices.__name__, DeviceInfo.FIELDS.values())
+Device._register_live_fallback()  # pylint: disable=protected-access
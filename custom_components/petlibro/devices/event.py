@@ -2,37 +2,154 @@
 
 from __future__ import annotations
 
-from collections.abc import Callable
+from asyncio import Future, TimerHandle, ensure_future, get_running_loop
+from collections.abc import Callable, Collection, Iterable
 from dataclasses import dataclass, field
+from functools import partial
+from inspect import isawaitable
+from logging import getLogger
+from time import monotonic
 from typing import Any
 
 EVENT_UPDATE = "update"
+EVENT_FEED = "feed"
+EVENT_FEEDING_RECORDS = "feeding_records"
+
+ERROR_LOG_INTERVAL = 60
+"""Seconds between two logged errors of the same listener, the errors in between are only counted."""
+
+_LOGGER = getLogger(__name__)
+
+
+@dataclass(eq=False, slots=True)
+class Listener:
+    """An event callback registration."""
+
+    event_name: str
+    callback: Callable[..., Any]
+    keys: frozenset[str] | None = None
+    coalesce: float | None = None
+    """Seconds to collect emits before running the callback once, ``None`` to run it on every emit."""
+    active: bool = True
+    pending: tuple[tuple[Any, ...], dict[str, Any]] | None = None
+    """Arguments of the last coalesced emit."""
+    pending_keys: set[str] | None = None
+    """Keys of all the coalesced emits, ``None`` if they were emitted without keys."""
+    handle: TimerHandle | None = None
+    errors: int = 0
+    """Errors not logged since the last logged one."""
+    error_logged: float | None = None
+
+    def cancel(self) -> None:
+        """Drop the pending coalesced emit."""
+        if self.handle is not None:
+            self.handle.cancel()
+        self.handle = None
+        self.pending = None
+        self.pending_keys = None
 
 
 @dataclass
 class Event:
     """Abstract event class properties and methods."""
 
-    _listeners: dict[str, list[Callable]] = field(default_factory=dict)
+    _listeners: dict[str, dict[Listener, None]] = field(default_factory=dict)
+    _tasks: set[Future[Any]] = field(default_factory=set)
+
+    def emit(self, event_name: str, *args: Any, keys: Collection[str] | None = None, **kwargs: Any) -> None:
+        """
+        Run all callbacks for an event.
+
+        When ``keys`` is set, they are passed to the callbacks as the first argument and listeners registered for
+        specific keys are only run if one of them is in ``keys``.
+        Coalesced listeners run once at the end of their window, with the keys of all the collected emits and the
+        other arguments of the last emit.
+        """
+        if not (listeners := self._listeners.get(event_name)):
+            return
 
-    def emit(self, event_name: str, *args: Any, **kwargs: Any) -> None:
-        """Run all callbacks for an event."""
-        for listener in self._listeners.get(event_name, []):
-            try:
-                listener(*args, **kwargs)
-            except:  # pragma: no cover # pylint: disable=bare-except # noqa: E722
-                pass
+        # Listeners can unsubscribe while the event is dispatched
+        for listener in tuple(listeners):
+            if not listener.active:
+                continue
+            if keys is not None and listener.keys is not None and listener.keys.isdisjoint(keys):
+                continue
+
+            if listener.coalesce is None:
+                self._run(listener, args if keys is None else (keys, *args), kwargs)
+                continue
+            if listener.pending is None:
+                listener.handle = get_running_loop().call_later(listener.coalesce, self._flush, listener)
+            if keys is not None:
+                listener.pending_keys = set(keys) | (listener.pending_keys or set())
+            listener.pending = (args, kwargs)
+
+    def _flush(self, listener: Listener) -> None:
+        """Run a coalesced listener with the collected keys and the arguments of the last emit."""
+        listener.handle = None
+        if listener.pending is None or not listener.active:
+            return
+        (args, kwargs), listener.pending = listener.pending, None
+        if (keys := listener.pending_keys) is not None:
+            listener.pending_keys = None
+            args = (keys, *args)
+        self._run(listener, args, kwargs)
+
+    def _run(self, listener: Listener, args: tuple[Any, ...], kwargs: dict[str, Any]) -> None:
+        """Run a listener, coroutine callbacks are run in a task."""
+        try:
+            result = listener.callback(*args, **kwargs)
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            self._log_error(listener, ex)
+            return
+
+        if isawaitable(result):
+            task = ensure_future(result)
+            self._tasks.add(task)
+            task.add_done_callback(partial(self._task_done, listener))
+
+    def _task_done(self, listener: Listener, task: Future[Any]) -> None:
+        """Forget a finished coroutine listener task, log its error if any."""
+        self._tasks.discard(task)
+        if not task.cancelled() and (ex := task.exception()) is not None:
+            self._log_error(listener, ex)
+
+    @staticmethod
+    def _log_error(listener: Listener, ex: BaseException) -> None:
+        """Log a listener error, at most once every ERROR_LOG_INTERVAL per listener."""
+        now = monotonic()
+        if listener.error_logged is not None and now - listener.error_logged < ERROR_LOG_INTERVAL:
+            listener.errors += 1
+            return
+
+        _LOGGER.error(
+            "Error in %s listener %s%s", listener.event_name,
+            getattr(listener.callback, "__qualname__", listener.callback),
+            f" ({listener.errors} more errors since the last logged one)" if listener.errors else "",
+            exc_info=ex
+        )
+        listener.error_logged = now
+        listener.errors = 0
 
     def on(  # pylint: disable=invalid-name
-        self, event_name: str, callback: Callable
+        self, event_name: str, callback: Callable, keys: Iterable[str] | None = None, coalesce: float | None = None
     ) -> Callable:
-        """Register an event callback."""
-        listeners: list = self._listeners.setdefault(event_name, [])
-        listeners.append(callback)
+        """
+        Register an event callback.
+
+        :param callback: Function or coroutine function, coroutines are run in a task
+        :param keys: Only run the callback when the event is emitted for one of these keys, on every emit if not set
+        :param coalesce: Collect the emits for this many seconds then run the callback once, ``0`` to collect
+            the emits of the current event loop iteration. Run on every emit if not set
+        """
+        listeners = self._listeners.setdefault(event_name, {})
+        listener = Listener(event_name, callback, None if keys is None else frozenset(keys), coalesce)
+        listeners[listener] = None
 
         def unsubscribe() -> None:
             """Unsubscribe listeners."""
-            if callback in listeners:
-                listeners.remove(callback)
+            listener.active = False
+            listener.cancel()
+            listeners.pop(listener, None)
 
         return unsubscribe
@@ -1,6 +1,18 @@
 """Generic PETLIBRO feeder"""
-from typing import Optional, cast
+from collections import deque
+from dataclasses import replace
+from datetime import datetime, timedelta
+from typing import Any, Optional, cast
+
+from homeassistant.util import dt as dt_util
+
+from ...api import PetLibroAPI
+from ...const import FEEDING_REFRESH_DELAY, POLL_INTERVAL_IDLE, POLL_INTERVAL_SLOW
 from . import Device
+from ..device import Endpoint
+from ..event import EVENT_FEED, EVENT_FEEDING_RECORDS
+from ..models import StateModel
+from .models import FeederRealInfo, FeedingHistory, FeedingPlanToday, FeedingRecord
 
 
 UNITS = {
@@ -17,19 +29,152 @@ UNITS_RATIO = {
     4: 20
 }
 
+FEEDING_RECORDS_SIZE = 20
+"""Feeding records kept per device."""
+
 class Feeder(Device):
     """Generic PETLIBRO feeder device"""
 
-    async def refresh(self):
-        await super().refresh()
-        self.update_data({
-            "feedingPlanTodayNew": await self.api.device_feeding_plan_today_new(self.serial)
-        })
+    ENDPOINTS = Device.ENDPOINTS | {
+        "realInfo": Endpoint(PetLibroAPI.device_real_info, FeederRealInfo),
+        "feedingPlanTodayNew": Endpoint(
+            PetLibroAPI.device_feeding_plan_today_new, FeedingPlanToday, "feedingPlanTodayNew", POLL_INTERVAL_SLOW
+        ),
+        "feedingRecords": Endpoint(
+            PetLibroAPI.device_feeding_records, FeedingHistory, "feedingRecords", POLL_INTERVAL_IDLE, project=False
+        ),
+    }
+    FEEDING_STATE_ENDPOINTS: frozenset[str] = frozenset({"feedingRecords"})
+    """Endpoints reflecting the feeding state, refreshed shortly after each planned feed."""
+
+    def __init__(self, data: dict, api: PetLibroAPI):
+        self.feeding_records: deque[FeedingRecord] = deque(maxlen=FEEDING_RECORDS_SIZE)
+        """Latest feeding records ingested since startup, oldest first."""
+        self._ingested: list[FeedingRecord] = []
+        """Feeding records parsed from the last payload, added once its state is saved."""
+        self._backfill = False
+        """The ingested records come from the first fetch."""
+        super().__init__(data, api)
+
+    async def fetch_endpoint(self, endpoint: str, fresh: bool = False) -> dict[str, Any]:
+        if endpoint != "feedingRecords":
+            return await super().fetch_endpoint(endpoint, fresh)
+
+        # Only fetch the records newer than the last ingested one, today's records on the first fetch
+        if (history := self.feeding_history) is not None and history.cursor is not None:
+            since = dt_util.utc_from_timestamp(history.cursor / 1000) + timedelta(milliseconds=1)
+        else:
+            since = dt_util.start_of_local_day()
+        return {
+            "since": int(since.timestamp() * 1000),
+            "records": await self.api.device_feeding_records(self.serial, since)
+        }
+
+    def parse(self, endpoint: str, payload: dict[str, Any]) -> StateModel:
+        if endpoint == "feedingRecords" and "records" in payload:
+            return self._ingest_feeding_records(payload["since"], payload["records"])
+        return super().parse(endpoint, payload)
+
+    def _ingest_feeding_records(self, since: int, records: list[dict[str, Any]]) -> FeedingHistory:
+        """
+        Parse the new feeding records, they are added by ``update_state`` once the history is saved
+
+        :param since: Time in milliseconds the records were fetched from
+        :param records: The fetched records, oldest first
+        :return: The feeding history with the last feed and the cursor of the new records
+        """
+        history = self.feeding_history or FeedingHistory()
+        backfill = history.cursor is None
+        cursor = since - 1 if history.cursor is None else history.cursor
+        ingested: list[FeedingRecord] = []
+        for item in records:
+            if (record_time := item["recordTime"]) <= cursor:
+                continue
+            cursor = record_time
+            portions = item.get("actualGrainNum") or 0
+            record = FeedingRecord(
+                dt_util.utc_from_timestamp(record_time / 1000), portions, self.convert_unit(portions)
+            )
+            ingested.append(record)
+            history = replace(history, last_feed_time=record.time, last_feed_portions=portions)
+        self._ingested, self._backfill = ingested, backfill
+        return replace(history, cursor=cursor)
+
+    def _add_ingested_records(self) -> None:
+        """
+        Add the ingested feeding records to the ring buffer, emit a feed event for each of them
+
+        No feed events are emitted for the records of the first fetch, they happened before the device was known.
+        A feeding records event is emitted with all the new records, those of the first fetch included.
+        """
+        ingested, self._ingested = self._ingested, []
+        self.feeding_records.extend(ingested)
+        if not self._backfill:
+            for record in ingested:
+                self.emit(EVENT_FEED, record)
+        if ingested:
+            self.emit(EVENT_FEEDING_RECORDS, ingested)
+
+    def update_state(self, endpoint: str, state: StateModel) -> None:
+        with self.batch_update():
+            super().update_state(endpoint, self.convert_state(state))
+
+            # The quantities follow the device unit
+            if endpoint == "realInfo":
+                for name, other in list(self._state.items()):
+                    if name != endpoint:
+                        super().update_state(name, self.convert_state(other))
+
+        # The feed listeners read the saved feeding history
+        if endpoint == "feedingRecords":
+            self._add_ingested_records()
+
+    def convert_state(self, state: StateModel) -> StateModel:
+        """Convert the quantities of an endpoint state to the device unit."""
+        if isinstance(state, FeedingHistory):
+            return replace(state, last_feed_quantity=(
+                None if state.last_feed_portions is None else self.convert_unit(state.last_feed_portions)
+            ))
+        return state
+
+    def next_refresh(self, endpoint: str, polled: datetime) -> datetime | None:
+        if endpoint in self.FEEDING_STATE_ENDPOINTS:
+            return next(
+                (
+                    refresh
+                    for feeding_time in self.today_feeding_plan
+                    if (refresh := feeding_time + FEEDING_REFRESH_DELAY) > polled
+                ),
+                None
+            )
+        return super().next_refresh(endpoint, polled)
+
+    @property
+    def real_info(self) -> FeederRealInfo | None:
+        return cast(FeederRealInfo | None, self._state.get("realInfo"))
+
+    @property
+    def feeding_plan_today(self) -> FeedingPlanToday | None:
+        """Today's feeding plan state, ``None`` until fetched."""
+        return cast(FeedingPlanToday | None, self._state.get("feedingPlanTodayNew"))
+
+    @property
+    def feeding_history(self) -> FeedingHistory | None:
+        """Last feed and feeding records cursor, ``None`` until fetched."""
+        return cast(FeedingHistory | None, self._state.get("feedingRecords"))
+
+    @property
+    def last_feed_time(self) -> datetime | None:
+        return history.last_feed_time if (history := self.feeding_history) else None
+
+    @property
+    def last_feed_quantity(self) -> float | None:
+        return history.last_feed_quantity if (history := self.feeding_history) else None
 
     @property
     def unit_id(self) -> int | None:
         """The device unit type identifier"""
-        return self._data.get("unitType")
+        return real_info.unit_id if (real_info := self.real_info) else None
 
     @property
     def unit_type(self) -> str | None:
@@ -42,22 +187,41 @@ class Feeder(Device):
         return unit
 
     @property
-    def feeding_plan(self) -> bool:
-        return self._data.get("enableFeedingPlan", False)
+    def feeding_plan(self) -> bool | None:
+        return real_info.feeding_plan if (real_info := self.real_info) else None
 
     async def set_feeding_plan(self, value: bool):
-        await self.api.set_device_feeding_plan(self.serial, value)
-        await self.refresh()
+        await self.optimistic_update(
+            {"feeding_plan": value}, self.api.set_device_feeding_plan(self.serial, value), "realInfo"
+        )
+
+    @property
+    def feeding_plan_today_all(self) -> bool | None:
+        if (plan := self.feeding_plan_today) is None:
+            return None
+        return not plan.all_skipped
 
     @property
-    def feeding_plan_today_all(self) -> bool:
-        return not cast(bool, self._data.get("feedingPlanTodayNew", {}).get("allSkipped"))
+    def today_feeding_plan(self) -> list[datetime]:
+        """Today's planned feeding times, skipped feeds excluded"""
+        if (plan := self.feeding_plan_today) is None or plan.all_skipped:
+            return []
+
+        today = dt_util.start_of_local_day()
+        return sorted(
+            datetime.combine(today.date(), feed.execution_time, today.tzinfo)
+            for feed in plan.plans or ()
+            if not feed.skip
+        )
 
     async def set_feeding_plan_today_all(self, value: bool):
-        await self.api.set_device_feeding_plan_today_all(self.serial, value)
-        await self.refresh()
+        await self.optimistic_update(
+            {"all_skipped": not value},
+            self.api.set_device_feeding_plan_today_all(self.serial, value),
+            "feedingPlanTodayNew"
+        )
 
-    def convert_unit(self, value: int) -> int:
+    def convert_unit(self, value: int) -> float:
         """
         Convert a value to the device unit
 
@@ -1,27 +1,39 @@
+from dataclasses import replace
 from typing import cast
 
+from ...api import PetLibroAPI
+from ...const import POLL_INTERVAL_IDLE
+from ..device import Endpoint
+from ..models import StateModel
 from .feeder import Feeder
+from .models import GrainStatus
 
 
 class GranaryFeeder(Feeder):
-    async def refresh(self):
-        await super().refresh()
-        self.update_data({
-            "grainStatus": await self.api.device_grain_status(self.serial)
-        })
+    ENDPOINTS = Feeder.ENDPOINTS | {
+        "grainStatus": Endpoint(PetLibroAPI.device_grain_status, GrainStatus, "grainStatus", POLL_INTERVAL_IDLE),
+    }
+    FEEDING_STATE_ENDPOINTS = Feeder.FEEDING_STATE_ENDPOINTS | {"grainStatus"}
+
+    def convert_state(self, state: StateModel) -> StateModel:
+        if isinstance(state, GrainStatus):
+            quantity = self.convert_unit(state.today_feeding_portions) if state.today_feeding_portions else 0
+            return replace(state, today_feeding_quantity=quantity)
+        return super().convert_state(state)
 
     @property
-    def remaining_desiccant(self) -> str:
-        return cast(str, self._data.get("remainingDesiccantDays"))
+    def grain_status(self) -> GrainStatus | None:
+        """Today's feeding stats, ``None`` until fetched."""
+        return cast(GrainStatus | None, self._state.get("grainStatus"))
 
     @property
-    def today_feeding_quantity(self) -> int:
-        quantity = self._data.get("grainStatus", {}).get("todayFeedingQuantity")
-        if not quantity:
-            return 0
+    def remaining_desiccant(self) -> int | None:
+        return real_info.remaining_desiccant if (real_info := self.real_info) else None
 
-        return self.convert_unit(quantity)
+    @property
+    def today_feeding_quantity(self) -> float | None:
+        return grain_status.today_feeding_quantity if (grain_status := self.grain_status) else None
 
     @property
-    def today_feeding_times(self) -> int:
-        return cast(int, self._data.get("grainStatus", {}).get("todayFeedingTimes"))
+    def today_feeding_times(self) -> int | None:
+        return grain_status.today_feeding_times if (grain_status := self.grain_status) else None
@@ -0,0 +1,119 @@
+"""Typed state of the PETLIBRO feeders endpoints."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, time
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from ..models import RealInfo, StateModel
+
+
+@dataclass(frozen=True, slots=True)
+class FeederRealInfo(RealInfo):
+    """Live feeder state, from the ``realInfo`` endpoint."""
+
+    FIELDS = RealInfo.FIELDS | {
+        "unit_id": "unitType",
+        "feeding_plan": "enableFeedingPlan",
+        "remaining_desiccant": "remainingDesiccantDays",
+    }
+
+    unit_id: int | None = None
+    feeding_plan: bool | None = None
+    remaining_desiccant: int | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class PlannedFeed:
+    """A feed of today's feeding plan."""
+
+    execution_time: time
+    skip: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class FeedingPlanToday(StateModel):
+    """Today's feeding plan, from the ``feedingPlanTodayNew`` endpoint."""
+
+    FIELDS = {
+        "all_skipped": "allSkipped",
+        "plans": "plans",
+    }
+
+    all_skipped: bool | None = None
+    plans: tuple[PlannedFeed, ...] | None = None
+
+    @classmethod
+    def parse_field(cls, name: str, value: Any) -> Any:
+        if name != "plans":
+            return value
+        # Feeds without a valid time can't be scheduled, they are dropped
+        return tuple(
+            PlannedFeed(execution_time, bool(item.get("skip")))
+            for item in value or []
+            if (execution_time := dt_util.parse_time(str(item.get("executionTime"))))
+        )
+
+    def dump_field(self, name: str, value: Any) -> Any:
+        if name != "plans":
+            return value
+        return [{"executionTime": feed.execution_time.strftime("%H:%M:%S"), "skip": feed.skip} for feed in value]
+
+
+@dataclass(frozen=True, slots=True)
+class GrainStatus(StateModel):
+    """Today's feeding stats, from the ``grainStatus`` endpoint."""
+
+    FIELDS = {
+        "today_feeding_times": "todayFeedingTimes",
+        "today_feeding_portions": "todayFeedingQuantity",
+    }
+
+    today_feeding_times: int | None = None
+    today_feeding_portions: int | None = None
+    """Quantity fed today, in portions as returned by the API."""
+    today_feeding_quantity: float | None = None
+    """Quantity fed today converted to the device unit, set by the device."""
+
+
+@dataclass(frozen=True, slots=True)
+class FeedingRecord:
+    """A feed reported by the device."""
+
+    time: datetime
+    portions: int
+    """Quantity fed, in portions as returned by the API."""
+    quantity: float
+    """Quantity fed, converted to the device unit when ingested."""
+
+
+@dataclass(frozen=True, slots=True)
+class FeedingHistory(StateModel):
+    """Last feed and ingestion cursor of the ``workRecord`` endpoint."""
+
+    FIELDS = {
+        "cursor": "cursor",
+        "last_feed_time": "lastFeedTime",
+        "last_feed_portions": "lastFeedPortions",
+    }
+
+    cursor: int | None = None
+    """Time in milliseconds of the newest ingested record, the next records are fetched from there."""
+    last_feed_time: datetime | None = None
+    last_feed_portions: int | None = None
+    last_feed_quantity: float | None = None
+    """Quantity of the last feed converted to the device unit, set by the device."""
+
+    @classmethod
+    def parse_field(cls, name: str, value: Any) -> Any:
+        if name == "last_feed_time" and value is not None:
+            return dt_util.utc_from_timestamp(value / 1000)
+        return value
+
+    def dump_field(self, name: str, value: Any) -> Any:
+        if name == "last_feed_time":
+            return int(value.timestamp() * 1000)
+        return value
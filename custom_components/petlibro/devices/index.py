@@ -0,0 +1,52 @@
+"""Index of the PETLIBRO devices of a hub."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from typing import TypeVar
+
+from .device import Device
+
+_DeviceT = TypeVar("_DeviceT", bound=Device)
+
+
+class DeviceIndex:
+    """Devices indexed by serial and by type, every device type of their hierarchy included"""
+
+    def __init__(self, devices: Iterable[Device] = ()) -> None:
+        self._by_serial: dict[str, Device] = {}
+        self._by_type: dict[type[Device], dict[str, Device]] = {}
+        for device in devices:
+            self.add(device)
+
+    def add(self, device: Device) -> None:
+        """Index a device, replacing any device with the same serial."""
+        self.remove(device.serial)
+        self._by_serial[device.serial] = device
+        for device_type in type(device).__mro__:
+            if isinstance(device_type, type) and issubclass(device_type, Device):
+                self._by_type.setdefault(device_type, {})[device.serial] = device
+
+    def remove(self, serial: str) -> Device | None:
+        """Drop a device from the index, return it if found."""
+        if (device := self._by_serial.pop(serial, None)) is not None:
+            for devices in self._by_type.values():
+                devices.pop(serial, None)
+        return device
+
+    def get(self, serial: str) -> Device | None:
+        """Return the device with the specified serial number, if found."""
+        return self._by_serial.get(serial)
+
+    def of_type(self, device_type: type[_DeviceT]) -> list[_DeviceT]:
+        """Return the devices of a type, subclasses included."""
+        return list(self._by_type.get(device_type, {}).values())  # type: ignore[arg-type]
+
+    def __contains__(self, serial: object) -> bool:
+        return serial in self._by_serial
+
+    def __iter__(self) -> Iterator[Device]:
+        return iter(list(self._by_serial.values()))
+
+    def __len__(self) -> int:
+        return len(self._by_serial)
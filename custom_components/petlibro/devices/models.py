@@ -0,0 +1,90 @@
+"""Typed state of the PETLIBRO devices endpoints, parsed once from the API payloads."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields, replace
+from typing import Any, ClassVar, Self
+
+
+@dataclass(frozen=True, slots=True)
+class StateModel:
+    """
+    State of a device endpoint
+
+    Only the fields used by the integration are kept, each read from its payload key in ``FIELDS``.
+    Unknown fields are ``None``.
+    """
+
+    FIELDS: ClassVar[dict[str, str]] = {}
+    """Payload key by field name."""
+
+    @classmethod
+    def parse(cls, payload: dict[str, Any], previous: Self | None = None) -> Self:
+        """
+        Parse an endpoint payload
+
+        :param payload: The endpoint payload
+        :param previous: The current state, its fields missing from the payload are kept
+        :return: The new state
+        """
+        values = {name: cls.parse_field(name, payload[key]) for name, key in cls.FIELDS.items() if key in payload}
+        return replace(previous, **values) if previous is not None else cls(**values)
+
+    @classmethod
+    def parse_field(cls, name: str, value: Any) -> Any:
+        """Convert a payload value to its field value."""
+        return value
+
+    def dump_field(self, name: str, value: Any) -> Any:
+        """Convert a field value back to its payload value."""
+        return value
+
+    def to_payload(self) -> dict[str, Any]:
+        """Return the known fields as an endpoint payload."""
+        return {
+            key: self.dump_field(name, value)
+            for name, key in self.FIELDS.items()
+            if (value := getattr(self, name)) is not None
+        }
+
+    def diff(self, other: StateModel | None) -> set[str]:
+        """Return the names of the fields that differ from another state, the known ones if there is none."""
+        return {
+            field.name
+            for field in fields(self)
+            if getattr(self, field.name) != (None if other is None else getattr(other, field.name))
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class DeviceInfo(StateModel):
+    """Device details, from the devices list and the ``baseInfo`` endpoint."""
+
+    FIELDS = {
+        "serial": "deviceSn",
+        "name": "name",
+        "model": "productIdentifier",
+        "model_name": "productName",
+        "mac": "mac",
+        "software_version": "softwareVersion",
+        "hardware_version": "hardwareVersion",
+    }
+
+    serial: str | None = None
+    name: str | None = None
+    model: str | None = None
+    model_name: str | None = None
+    mac: str | None = None
+    software_version: str | None = None
+    hardware_version: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class RealInfo(StateModel):
+    """Live device state, from the ``realInfo`` endpoint."""
+
+    FIELDS = {
+        "online": "online",
+    }
+
+    online: bool | None = None
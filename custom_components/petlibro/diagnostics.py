@@ -0,0 +1,56 @@
+"""Diagnostics support for PETLIBRO."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_API_TOKEN, CONF_EMAIL
+from homeassistant.core import HomeAssistant
+
+from . import PetLibroHubConfigEntry
+
+TO_REDACT = {CONF_API_TOKEN, CONF_EMAIL, "deviceSn", "mac", "title", "unique_id"}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: PetLibroHubConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    hub = entry.runtime_data
+    session = hub.api.session
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "requests": session.metrics.as_dict(),
+        "limiter": {
+            "rate": session.limiter.rate,
+            "burst": session.limiter.burst,
+            "max_in_flight": session.limiter.max_in_flight,
+            "in_flight": session.limiter.in_flight,
+            "waiting": session.limiter.waiting,
+        },
+        "circuit_breaker": {
+            "open": session.breaker.is_open,
+            "failures": session.breaker.failures,
+            "cooldown": session.breaker.cooldown,
+        },
+        "client": {
+            "region": hub.client.region,
+            "entries": len(hub.client),
+            "poll_offset": hub.poll_offset.total_seconds(),
+        },
+        "refresh": hub.refresh_metrics.as_dict(),
+        "devices": [
+            {
+                "type": type(device).__name__,
+                "available": hub.is_available(device),
+                "last_success": device.last_success.isoformat() if device.last_success else None,
+                "failures": device.failures,
+                "refresh_duration": hub.refresh_metrics.device_durations.get(device.serial),
+                "poll_intervals": {
+                    endpoint: hub.scheduler.interval(device, endpoint).total_seconds()
+                    for endpoint in device.ENDPOINTS
+                },
+                "data": async_redact_data(device.snapshot()["data"], TO_REDACT),
+            }
+            for device in hub.devices
+        ],
+    }
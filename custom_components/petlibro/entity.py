@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
-from typing import Generic, TypeVar
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar, overload
 from functools import cached_property
 
-from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.core import callback
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity import EntityDescription
 from homeassistant.helpers.update_coordinator import CoordinatorEntity, DataUpdateCoordinator
 
@@ -15,6 +19,52 @@ from .const import DOMAIN
 from .hub import PetLibroHub
 
 _DeviceT = TypeVar("_DeviceT", bound=Device)
+_T = TypeVar("_T")
+
+ENTITY_UPDATE_COALESCE = 0
+"""Device updates emitted in the same event loop iteration only write the entity state once."""
+
+
+class device_cached_property(Generic[_T]):  # pylint: disable=invalid-name
+    """
+    Property memoized against the entity device data generation
+
+    The value is computed once per device data generation and recomputed after the device data changed.
+    It is a data descriptor, so values cached in the instance ``__dict__`` by the Home Assistant cached properties
+    of the same name can't shadow it.
+    """
+
+    def __init__(self, func: Callable[[Any], _T]) -> None:
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    @overload
+    def __get__(self, instance: None, owner: type | None = None) -> device_cached_property[_T]: ...
+
+    @overload
+    def __get__(self, instance: PetLibroEntity, owner: type | None = None) -> _T: ...
+
+    def __get__(self, instance: PetLibroEntity | None, owner: type | None = None) -> _T | device_cached_property[_T]:
+        if instance is None:
+            return self
+        generation = instance.device.generation
+        cache = instance.__dict__.setdefault("_device_cache", {})
+        if (cached := cache.get(self.name)) is not None and cached[0] == generation:
+            return cached[1]
+        value = self.func(instance)
+        cache[self.name] = (generation, value)
+        return value
+
+    def __set__(self, instance: PetLibroEntity, value: _T) -> None:
+        raise AttributeError(f"{self.name} is computed from the device data")
+
+    def __delete__(self, instance: PetLibroEntity) -> None:
+        """Drop the memoized value, it is recomputed on the next read."""
+        instance.__dict__.get("_device_cache", {}).pop(self.name, None)
 
 
 class PetLibroEntity(
@@ -33,6 +83,12 @@ class PetLibroEntity(
         self.hub = hub
         self.entity_description = description
         self._attr_unique_id = f"{self.device.serial}-{description.key}"
+        self._last_available: bool | None = None
+
+    @property
+    def available(self) -> bool:
+        """Serve the last known device values until they are stale."""
+        return self.hub.is_available(self.device)
 
     @cached_property
     def device_info(self) -> DeviceInfo | None:
@@ -50,7 +106,46 @@ class PetLibroEntity(
     async def async_added_to_hass(self) -> None:
         """Set up a listener for the entity."""
         await super().async_added_to_hass()
-        self.async_on_remove(self.device.on(EVENT_UPDATE, self.async_write_ha_state))
+        self._last_available = self.available
+        self.async_on_remove(self.device.on(
+            EVENT_UPDATE, self._handle_device_update, self.entity_description.data_keys, ENTITY_UPDATE_COALESCE
+        ))
+
+    @callback
+    def _handle_device_update(self, _changed_keys: set[str]) -> None:
+        """Write the entity state when the device data it depends on changed."""
+        self.async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Only write the state when the availability changed, data changes come from the device updates."""
+        if (available := self.available) != self._last_available:
+            self._last_available = available
+            self.async_write_ha_state()
 
+
+class PetLibroHubEntity(CoordinatorEntity[DataUpdateCoordinator[bool]]):
+    """PETLIBRO entity of the hub itself, updated on each refresh cycle."""
+
+    _attr_has_entity_name = True
+
+    def __init__(self, hub: PetLibroHub, entry: ConfigEntry, description: EntityDescription) -> None:
+        """Pass coordinator to CoordinatorEntity."""
+        super().__init__(hub.coordinator)
+        self.hub = hub
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}-{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            manufacturer="PETLIBRO",
+            name=entry.title,
+            entry_type=DeviceEntryType.SERVICE
+        )
+
+
+@dataclass(frozen=True, kw_only=True)
 class PetLibroEntityDescription(EntityDescription, Generic[_DeviceT]):
     """PETLIBRO Entity description"""
+
+    data_keys: tuple[str, ...] | None = None
+    """Device state fields the entity depends on, as ``endpoint.field`` paths. Updated on any change if not set."""
@@ -11,3 +11,7 @@ class PetLibroCannotConnect(PetLibroAPIError):
 
 class PetLibroInvalidAuth(PetLibroAPIError):
     """Error to indicate there is invalid auth."""
+
+
+class PetLibroCircuitOpen(PetLibroCannotConnect):
+    """Error to indicate requests are suspended after repeated connection failures."""
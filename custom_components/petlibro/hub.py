@@ -1,68 +1,277 @@
 from logging import getLogger
-from asyncio import gather
-from collections.abc import Mapping
-from typing import List, Any, Optional
-from datetime import timedelta
+from asyncio import Lock, gather, sleep
+from time import monotonic
+from collections.abc import Iterable, Mapping
+from typing import Any, Optional
+from datetime import datetime, timedelta
 
 from homeassistant.core import HomeAssistant
-from homeassistant.const import CONF_REGION, CONF_API_TOKEN
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.const import CONF_REGION, CONF_API_TOKEN, Platform
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
 from aiohttp import ClientResponseError, ClientConnectorError
 
-from custom_components.petlibro.api import PetLibroAPI
-
-from .const import DOMAIN
-from .api import PetLibroAPIError
-from .devices import Device, product_name_map
+from .const import (
+    DOMAIN, CONF_DEDICATED_CONNECTION, CONF_MAX_IN_FLIGHT, CONF_REQUEST_RATE, CONF_REQUEST_TIMEOUT, CONF_STALE_AFTER,
+    DEFAULT_REQUEST_TIMEOUT, DEFAULT_STALE_AFTER
+)
+from .api import PetLibroAPIError, request_timeout
+from .client import STAGGER_SLOTS, RegionClient
+from .exceptions import PetLibroCircuitOpen
+from .devices import Device, DeviceIndex, product_name_map
+from .metrics import RefreshMetrics
+from .scheduler import PollScheduler
 
 _LOGGER = getLogger(__name__)
-UPDATE_INTERVAL_SECONDS = 60 * 5
+MIN_UPDATE_INTERVAL = timedelta(seconds=15)
+MAX_UPDATE_INTERVAL = timedelta(minutes=5)
+DEVICE_BACKOFF = timedelta(minutes=1)
+"""Delay before polling a failing device again, doubled on each new failure."""
+MAX_DEVICE_BACKOFF = timedelta(minutes=30)
+SNAPSHOT_SAVE_DELAY = 60
+"""Seconds to wait for other changes before writing the devices snapshot."""
 
 
 class PetLibroHub:
     """A PetLibro hub wrapper class"""
 
-    devices : List[Device] = []
+    def __init__(self, hass: HomeAssistant, data: Mapping[str, Any], options: Mapping[str, Any] | None = None,
+                 store: Store[dict[str, Any]] | None = None, client: RegionClient | None = None) -> None:
+        """
+        Init the hub
 
-    def __init__(self, hass: HomeAssistant, data: Mapping[str, Any]) -> None:
-        """Init the hub"""
+        :param client: The client shared with the other hubs of the region, a private one if not set
+        """
         self._data = data
-        self.session = None
-        self.api = PetLibroAPI(async_get_clientsession(hass), hass.config.time_zone, data[CONF_REGION], data[CONF_API_TOKEN])
+        self.store = store
+        self._saved_generations: dict[str, int] = {}
+        self._options = options or {}
+        self.devices = DeviceIndex()
+        self.platforms: set[Platform] = set()
+        """Platforms set up for the hub devices."""
+        self.discovery_lock = Lock()
+        self._missing: set[str] = set()
+        """Serials missing from the last discovered devices list."""
+        self._unsupported: set[str | None] = set()
+        """Serials of the unsupported devices already reported."""
+        self.client = client if client is not None else RegionClient(hass, data[CONF_REGION])
+        self.api = self.client.create_api(
+            data[CONF_API_TOKEN], self._options.get(CONF_DEDICATED_CONNECTION, False),
+            request_timeout(self._options.get(CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT))
+        )
+        # Hubs sharing the client wake up at different times instead of all polling at once
+        slot = self.client.attach(self, self._options.get(CONF_REQUEST_RATE), self._options.get(CONF_MAX_IN_FLIGHT))
+        self.poll_offset = MIN_UPDATE_INTERVAL * slot / STAGGER_SLOTS
+        self.scheduler = PollScheduler()
+        self.refresh_metrics = RefreshMetrics()
+        self.stale_after = timedelta(minutes=self._options.get(CONF_STALE_AFTER, DEFAULT_STALE_AFTER))
 
         self.coordinator = DataUpdateCoordinator(
             hass,
             _LOGGER,
             name=DOMAIN,
             update_method=self.refresh_devices,
-            update_interval=timedelta(seconds=UPDATE_INTERVAL_SECONDS),
+            update_interval=MAX_UPDATE_INTERVAL,
         )
 
-    async def get_device(self, serial: str) -> Optional[Device]:
+    def get_device(self, serial: str) -> Optional[Device]:
         """If found, return the device with the specified serial number."""
-        return next(
-            (device for device in self.devices if device.serial == serial),
-            None,
-        )
+        return self.devices.get(serial)
 
-    async def load_devices(self):
-        """Get information about devices connected to the account."""
-        for device_data in await self.api.list_devices():
-            if device := await self.get_device(device_data["deviceSn"]):
-                await device.refresh()
+    def _create_device(self, device_data: dict) -> Device | None:
+        """Create a device from its devices list data, ``None`` if not supported."""
+        if device_data["productName"] not in product_name_map:
+            # Listed again on every discovery, only reported once
+            if (serial := device_data.get("deviceSn")) not in self._unsupported:
+                self._unsupported.add(serial)
+                _LOGGER.error("Unsupported device found: %s", device_data["productName"])
             else:
-                if device_data["productName"] in product_name_map:
-                    device = product_name_map[device_data["productName"]](device_data, self.api)
-                    await device.refresh()  # Get all API data
-                    self.devices.append(device)
-                else:
-                    _LOGGER.error("Unsupported device found: %s", device_data["productName"])
+                _LOGGER.debug("Skipping unsupported device: %s", device_data["productName"])
+            return None
+        return product_name_map[device_data["productName"]](device_data, self.api)
 
-    async def refresh_devices(self) -> bool:
-        """Update all known devices states from the PETLIBRO API."""
+    async def load_devices(self, refresh: bool = True):
+        """
+        Get information about devices connected to the account.
+
+        :param refresh: Fetch all the devices data, otherwise the devices only hold the devices list data
+        """
+        devices: list[Device] = []
+        for device_data in await self.api.list_devices():
+            if device := self.get_device(device_data["deviceSn"]):
+                devices.append(device)
+            elif device := self._create_device(device_data):
+                devices.append(device)
+                self.devices.add(device)
+
+        if not refresh:
+            return
+
+        # Get all API data, every device endpoints are fetched at once
+        now = dt_util.utcnow()
+        await gather(*(self.refresh_device(device, now) for device in devices))
+
+    async def discover_devices(self) -> tuple[list[Device], list[Device]]:
+        """
+        Diff the account devices list against the known devices.
+
+        New devices are added, to be refreshed with ``refresh_added_devices`` once their listeners are set up.
+        Devices missing from two lists in a row are dropped with their polling schedule, a truncated list doesn't
+        remove them at once. An empty list is not trusted. Devices still listed are left untouched.
+
+        :return: The added and the removed devices
+        """
+        self.api.invalidate_devices()
+        listed = {device_data["deviceSn"]: device_data for device_data in await self.api.list_devices()}
+        if not listed and len(self.devices):
+            _LOGGER.warning("The PETLIBRO devices list came back empty, keeping the known devices")
+            return [], []
+
+        added = [
+            device
+            for serial, device_data in listed.items()
+            if serial not in self.devices
+            if (device := self._create_device(device_data)) is not None
+        ]
+        missing = {device.serial for device in self.devices if device.serial not in listed}
+        removed = [
+            device
+            for serial in missing & self._missing
+            if (device := self.devices.remove(serial)) is not None
+        ]
+        self._missing = missing - self._missing
+        if self._missing:
+            _LOGGER.debug("Devices missing from the devices list, removed if still missing: %s", self._missing)
+        for device in removed:
+            device.cancel_tasks()
+            self.scheduler.forget(device.serial)
+            self._saved_generations.pop(device.serial, None)
+            self.refresh_metrics.device_durations.pop(device.serial, None)
+
+        for device in added:
+            self.devices.add(device)
+        if removed:
+            self.save_snapshot(force=True)
+        return added, removed
+
+    async def refresh_added_devices(self, devices: Iterable[Device]) -> None:
+        """Refresh discovered devices right away instead of on the next cycle."""
+        now = dt_util.utcnow()
+        await gather(*(self.refresh_device(device, now) for device in devices))
+
+    async def refresh_device(self, device: Device, now: datetime) -> None:
+        """
+        Poll the device endpoints that are due.
+
+        Failures are isolated to the device: it keeps its last known data and is polled again after a backoff.
+        """
+        if not (endpoints := self.scheduler.due(device, now)):
+            return
+
+        start = monotonic()
         try:
-            await gather(*(device.refresh() for device in self.devices))
+            payloads = await device.fetch(endpoints)
+        except ConfigEntryAuthFailed:
+            raise
+        except PetLibroCircuitOpen as ex:
+            # The circuit breaker already spaces out the requests
+            device.failures += 1
+            _LOGGER.debug("Skipping %s refresh: %s", device.serial, ex)
+            return
         except (PetLibroAPIError, ClientResponseError, ClientConnectorError) as ex:
-            _LOGGER.error("Unable to refresh your devices: %s", ex)
+            self._defer_failed(device, now, ex)
+            return
+        finally:
+            self.refresh_metrics.observe_device(device.serial, monotonic() - start)
+
+        try:
+            device.apply(payloads)
+            for endpoint, payload in payloads.items():
+                self.scheduler.record(device, endpoint, payload, now)
+            self.scheduler.reschedule(device)
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            # A malformed payload must not abort the refresh of the other devices
+            _LOGGER.debug("Invalid payload from %s", device.serial, exc_info=True)
+            self._defer_failed(device, now, ex)
+            return
+
+        device.last_success = now
+        device.failures = 0
+
+    def _defer_failed(self, device: Device, now: datetime, ex: Exception) -> None:
+        """Count a device refresh failure and back off its next poll."""
+        device.failures += 1
+        backoff = min(DEVICE_BACKOFF * 2 ** (device.failures - 1), MAX_DEVICE_BACKOFF)
+        self.scheduler.defer(device, now + backoff)
+        _LOGGER.error("Unable to refresh device %s, retrying in %s: %s", device.serial, backoff, ex)
+
+    def is_available(self, device: Device) -> bool:
+        """A device is available until it has been failing for longer than the staleness limit."""
+        if device.last_success is None:
+            # Not refreshed yet, its values are unknown until the first refresh
+            return not device.failures
+        return not device.failures or dt_util.utcnow() - device.last_success <= self.stale_after
+
+    async def refresh_devices(self) -> bool:
+        """Update all known devices states from the PETLIBRO API."""
+        now = dt_util.utcnow()
+        start = monotonic()
+        await gather(*(self.refresh_device(device, now) for device in self.devices))
+        self.refresh_metrics.observe_cycle(now, monotonic() - start)
+        self.save_snapshot()
+
+        # Wake up for the next due endpoint
+        if (next_due := self.scheduler.next_due()) is not None:
+            self.coordinator.update_interval = self._next_wake(next_due, dt_util.utcnow())
         return True
+
+    def _next_wake(self, next_due: datetime, now: datetime) -> timedelta:
+        """Return the delay until the next refresh, aligned on the hub polling phase."""
+        delay = min(max(next_due - now, MIN_UPDATE_INTERVAL), MAX_UPDATE_INTERVAL)
+        phase = MIN_UPDATE_INTERVAL.total_seconds()
+        return delay + timedelta(
+            seconds=(self.poll_offset.total_seconds() - (now + delay).timestamp()) % phase
+        )
+
+    async def first_refresh(self) -> None:
+        """Refresh the devices for the first time, once the hub polling phase starts."""
+        await sleep(self.poll_offset.total_seconds())
+        await self.coordinator.async_refresh()
+
+    async def restore_snapshot(self) -> None:
+        """Restore the devices last known state, their first poll is spread out instead of sent at once."""
+        if self.store is None or not (snapshot := await self.store.async_load()):
+            return
+
+        now = dt_util.utcnow()
+        for serial, device_snapshot in snapshot.get("devices", {}).items():
+            if device := self.get_device(serial):
+                device.restore(device_snapshot)
+                self._saved_generations[serial] = device.generation
+                self.scheduler.spread(device, now)
+
+    def save_snapshot(self, force: bool = False) -> None:
+        """
+        Schedule a snapshot write if any device data changed since the last one.
+
+        :param force: Write even if no device data changed, e.g. after a device was removed
+        """
+        if self.store is None:
+            return
+        if not force and all(self._saved_generations.get(device.serial) == device.generation for device in self.devices):
+            return
+
+        self._saved_generations = {device.serial: device.generation for device in self.devices}
+        self.store.async_delay_save(self._snapshot, SNAPSHOT_SAVE_DELAY)
+
+    def _snapshot(self) -> dict[str, Any]:
+        """Return the devices snapshot to persist."""
+        return {"devices": {device.serial: device.snapshot() for device in self.devices}}
+
+    async def async_close(self) -> None:
+        """Release the hub resources."""
+        for device in self.devices:
+            device.cancel_tasks()
+        await self.client.detach(self)
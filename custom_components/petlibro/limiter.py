@@ -0,0 +1,126 @@
+"""Client side rate limiting of the PETLIBRO API requests."""
+
+from __future__ import annotations
+
+from asyncio import CancelledError, Future, TimerHandle, get_running_loop
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from heapq import heappop, heappush
+from itertools import count
+from time import monotonic
+
+PRIORITY_COMMAND = 0
+"""User initiated requests (switch press, login...), always served first."""
+PRIORITY_POLL = 1
+"""Background polling requests."""
+
+DEFAULT_RATE = 5.0
+"""Requests per second allowed on average."""
+DEFAULT_BURST = 10
+"""Requests allowed in a burst after being idle."""
+DEFAULT_MAX_IN_FLIGHT = 4
+"""Requests allowed at the same time."""
+
+
+class RequestLimiter:
+    """
+    Token bucket rate limiter with a cap of requests in flight
+
+    Waiting requests are served by priority, then in arrival order, so a user command never waits behind
+    the queued polling requests.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST,
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self._tokens = float(burst)
+        self._updated = monotonic()
+        self._in_flight = 0
+        self._waiters: list[tuple[int, int, Future[None]]] = []
+        self._order = count()
+        self._wakeup: TimerHandle | None = None
+
+    def configure(self, rate: float, burst: int, max_in_flight: int) -> None:
+        """Change the limits, the waiting requests are dispatched with the new ones."""
+        self._refill()
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self._tokens = min(self._tokens, float(burst))
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        if self._waiters:
+            self._dispatch()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests in flight."""
+        return self._in_flight
+
+    @property
+    def waiting(self) -> int:
+        """Number of requests waiting for a slot."""
+        return sum(not waiter.done() for _, _, waiter in self._waiters)
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last refill."""
+        now = monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _dispatch(self) -> None:
+        """Let the waiting requests through while there are tokens and free slots."""
+        self._refill()
+        while self._waiters and self._in_flight < self.max_in_flight:
+            if self._waiters[0][2].done():  # Cancelled while waiting
+                heappop(self._waiters)
+                continue
+
+            if self._tokens < 1:
+                if self._wakeup is None:
+                    self._wakeup = get_running_loop().call_later((1 - self._tokens) / self.rate, self._wake)
+                return
+
+            _, _, waiter = heappop(self._waiters)
+            self._tokens -= 1
+            self._in_flight += 1
+            waiter.set_result(None)
+
+    def _wake(self) -> None:
+        """Dispatch once a new token is available."""
+        self._wakeup = None
+        self._dispatch()
+
+    async def acquire(self, priority: int = PRIORITY_POLL) -> None:
+        """
+        Wait for a request slot
+
+        :param priority: Request priority, lower is served first
+        """
+        waiter: Future[None] = get_running_loop().create_future()
+        heappush(self._waiters, (priority, next(self._order), waiter))
+        self._dispatch()
+        try:
+            await waiter
+        except CancelledError:
+            # The slot was granted right before the cancellation
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Free a request slot."""
+        self._in_flight -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_POLL) -> AsyncIterator[None]:
+        """Hold a request slot for the context duration."""
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
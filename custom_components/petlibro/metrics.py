@@ -0,0 +1,122 @@
+"""Requests and refresh metrics of the PETLIBRO integration."""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from math import inf
+from typing import Any
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, inf)
+"""Upper bounds in seconds of the latency histogram buckets."""
+
+
+@dataclass(slots=True)
+class EndpointMetrics:
+    """Requests metrics of an API endpoint."""
+
+    requests: int = 0
+    errors: int = 0
+    error_types: Counter[str] = field(default_factory=Counter)
+    latency_total: float = 0
+    latency_max: float = 0
+    latency_histogram: list[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS))
+
+    def observe(self, latency: float, error: str | None = None) -> None:
+        """Record a request."""
+        self.requests += 1
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+        self.latency_histogram[next(i for i, bound in enumerate(LATENCY_BUCKETS) if latency <= bound)] += 1
+        if error is not None:
+            self.errors += 1
+            self.error_types[error] += 1
+
+    @property
+    def latency_mean(self) -> float | None:
+        return self.latency_total / self.requests if self.requests else None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_types": dict(self.error_types),
+            "latency_mean": self.latency_mean,
+            "latency_max": self.latency_max,
+            "latency_histogram": {
+                f"le_{bound}": count for bound, count in zip(LATENCY_BUCKETS, self.latency_histogram)
+            },
+        }
+
+
+class RequestMetrics:
+    """Requests metrics by API endpoint"""
+
+    def __init__(self) -> None:
+        self.endpoints: dict[str, EndpointMetrics] = {}
+
+    def observe(self, path: str, latency: float, error: str | None = None) -> None:
+        """
+        Record a request
+
+        :param path: The request path
+        :param latency: The request duration in seconds
+        :param error: The error type name if the request failed
+        """
+        if (metrics := self.endpoints.get(path)) is None:
+            metrics = self.endpoints[path] = EndpointMetrics()
+        metrics.observe(latency, error)
+
+    @property
+    def requests(self) -> int:
+        return sum(metrics.requests for metrics in self.endpoints.values())
+
+    @property
+    def errors(self) -> int:
+        return sum(metrics.errors for metrics in self.endpoints.values())
+
+    @property
+    def latency_mean(self) -> float | None:
+        if not (requests := self.requests):
+            return None
+        return sum(metrics.latency_total for metrics in self.endpoints.values()) / requests
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency_mean": self.latency_mean,
+            "endpoints": {path: metrics.as_dict() for path, metrics in self.endpoints.items()},
+        }
+
+
+@dataclass(slots=True)
+class RefreshMetrics:
+    """Refresh cycles metrics."""
+
+    cycles: int = 0
+    last_cycle: datetime | None = None
+    last_cycle_duration: float | None = None
+    max_cycle_duration: float = 0
+    device_durations: dict[str, float] = field(default_factory=dict)
+    """Last refresh duration in seconds by device serial."""
+
+    def observe_cycle(self, start: datetime, duration: float) -> None:
+        """Record a refresh cycle."""
+        self.cycles += 1
+        self.last_cycle = start
+        self.last_cycle_duration = duration
+        self.max_cycle_duration = max(self.max_cycle_duration, duration)
+
+    def observe_device(self, serial: str, duration: float) -> None:
+        """Record a device refresh."""
+        self.device_durations[serial] = duration
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "cycles": self.cycles,
+            "last_cycle": self.last_cycle.isoformat() if self.last_cycle else None,
+            "last_cycle_duration": self.last_cycle_duration,
+            "max_cycle_duration": self.max_cycle_duration,
+        }
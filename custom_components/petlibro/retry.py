@@ -0,0 +1,105 @@
+"""Retry and circuit breaker policies of the PETLIBRO API requests."""
+
+from __future__ import annotations
+
+from random import uniform
+from time import monotonic
+
+from homeassistant.exceptions import ConfigEntryAuthFailed
+
+from .exceptions import PetLibroAPIError, PetLibroCannotConnect, PetLibroCircuitOpen, PetLibroInvalidAuth
+
+AUTH_ERROR_CODES = {
+    1009: ConfigEntryAuthFailed,
+    1102: PetLibroInvalidAuth,
+}
+"""API codes of the authentication failures, never retried."""
+
+
+def error_for_status(status: int, reason: str | None = None) -> PetLibroAPIError:
+    """Return the error of a non 200 HTTP response, server errors and throttling are transient."""
+    message = f"HTTP {status}: {reason}" if reason else f"HTTP {status}"
+    if status == 429 or status >= 500:
+        return PetLibroCannotConnect(message)
+    return PetLibroAPIError(message)
+
+
+def error_for_code(code: int | None, message: str | None = None) -> Exception:
+    """Return the error of a non 0 API code."""
+    if (error := AUTH_ERROR_CODES.get(code)) is not None:  # type: ignore[arg-type]
+        return error(message)
+    return PetLibroAPIError(f"Code: {code}, Message: {message}")
+
+
+def is_transient(ex: BaseException) -> bool:
+    """If the request might succeed when retried."""
+    return isinstance(ex, PetLibroCannotConnect) and not isinstance(ex, PetLibroCircuitOpen)
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+
+    def __init__(self, attempts: int = 3, base_delay: float = 0.5, max_delay: float = 10) -> None:
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """
+        Get the delay before retrying
+
+        :param attempt: The failed attempt number, starting at 1
+        :return: Delay in seconds
+        """
+        return uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """
+    Suspend the requests after repeated transient failures
+
+    Once ``threshold`` consecutive requests failed the circuit opens and every request fails right away.
+    A single probe request is let through per cooldown: the circuit closes if it succeeds, otherwise
+    the cooldown doubles.
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30, max_cooldown: float = 600) -> None:
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.failures = 0
+        self.cooldown = cooldown
+        self._next_probe: float | None = None
+
+    @property
+    def is_open(self) -> bool:
+        """If the requests are suspended."""
+        return self._next_probe is not None
+
+    def before_request(self) -> None:
+        """
+        Check a request is allowed
+
+        :raises PetLibroCircuitOpen: If the circuit is open and no probe is due
+        """
+        if self._next_probe is None:
+            return
+        if (now := monotonic()) < self._next_probe:
+            raise PetLibroCircuitOpen("PETLIBRO API unreachable, requests suspended")
+        # Let this request probe the API, the next one waits for another cooldown
+        self._next_probe = now + self.cooldown
+
+    def record_success(self) -> None:
+        """Record a request that reached the API."""
+        self.failures = 0
+        self.cooldown = self.base_cooldown
+        self._next_probe = None
+
+    def record_failure(self) -> None:
+        """Record a request failed with a transient error."""
+        self.failures += 1
+        if self.is_open:
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            self._next_probe = monotonic() + self.cooldown
+        elif self.failures >= self.threshold:
+            self._next_probe = monotonic() + self.cooldown
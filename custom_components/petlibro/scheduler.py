@@ -0,0 +1,127 @@
+"""Adaptive polling of the PETLIBRO devices endpoints."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from json import dumps
+from random import uniform
+from typing import Any
+
+from .devices import Device
+
+BACKOFF_AFTER_UNCHANGED = 3
+"""Number of polls with an unchanged payload before backing off."""
+MAX_BACKOFF_FACTOR = 8
+"""Maximum factor applied to an endpoint interval while backing off."""
+MAX_BACKOFF_INTERVAL = timedelta(hours=1)
+"""Backing off never pushes an endpoint interval past this limit (or its base interval if longer)."""
+
+
+def fingerprint(payload: Any) -> int:
+    """Return a stable hash of an endpoint payload."""
+    return hash(dumps(payload, sort_keys=True, default=str))
+
+
+@dataclass(slots=True)
+class EndpointSchedule:
+    """Polling state of a device endpoint."""
+
+    due: datetime
+    polled: datetime
+    fingerprint: int | None = None
+    unchanged: int = 0
+
+
+class PollScheduler:
+    """
+    Schedule the polling of each device endpoint
+
+    Each endpoint is polled at its own interval, endpoints that keep returning the same payload
+    are polled less and less often until their payload changes again.
+    Devices can request an earlier poll of an endpoint with ``Device.next_refresh``.
+    """
+
+    def __init__(self, backoff_after: int = BACKOFF_AFTER_UNCHANGED, max_backoff: int = MAX_BACKOFF_FACTOR,
+                 max_backoff_interval: timedelta = MAX_BACKOFF_INTERVAL) -> None:
+        self.backoff_after = backoff_after
+        self.max_backoff = max_backoff
+        self.max_backoff_interval = max_backoff_interval
+        self._schedules: dict[tuple[str, str], EndpointSchedule] = {}
+
+    def due(self, device: Device, now: datetime) -> list[str]:
+        """
+        List the device endpoints to poll
+
+        :param device: The device
+        :param now: Current time
+        :return: Names of the endpoints due for polling, never polled endpoints are always due
+        """
+        return [
+            name
+            for name in device.ENDPOINTS
+            if (schedule := self._schedules.get((device.serial, name))) is None or schedule.due <= now
+        ]
+
+    def record(self, device: Device, endpoint: str, payload: Any, now: datetime) -> None:
+        """
+        Record an endpoint poll and schedule the next one
+
+        :param device: The polled device
+        :param endpoint: The polled endpoint name
+        :param payload: The endpoint payload
+        :param now: Poll time
+        """
+        schedule = self._schedules.setdefault((device.serial, endpoint), EndpointSchedule(now, now))
+        if (current := fingerprint(payload)) == schedule.fingerprint:
+            schedule.unchanged += 1
+        else:
+            schedule.fingerprint = current
+            schedule.unchanged = 0
+
+        schedule.polled = now
+        schedule.due = now + self.interval(device, endpoint)
+
+    def reschedule(self, device: Device) -> None:
+        """Bring forward the device endpoints polls requested by the device."""
+        for endpoint in device.ENDPOINTS:
+            if (schedule := self._schedules.get((device.serial, endpoint))) is None:
+                continue
+            if (requested := device.next_refresh(endpoint, schedule.polled)) is not None and requested < schedule.due:
+                schedule.due = requested
+
+    def spread(self, device: Device, now: datetime) -> None:
+        """
+        Schedule the first poll of each device endpoint at a random time within its interval
+
+        Used for devices whose data is already known, to avoid polling them all at once.
+        """
+        for endpoint, definition in device.ENDPOINTS.items():
+            due = now + definition.interval * uniform(0, 1)
+            self._schedules[(device.serial, endpoint)] = EndpointSchedule(due, now)
+        self.reschedule(device)
+
+    def defer(self, device: Device, until: datetime) -> None:
+        """Postpone every device endpoint poll."""
+        for endpoint in device.ENDPOINTS:
+            schedule = self._schedules.setdefault((device.serial, endpoint), EndpointSchedule(until, until))
+            schedule.due = max(schedule.due, until)
+
+    def forget(self, serial: str) -> None:
+        """Drop the schedules of a removed device."""
+        for key in [key for key in self._schedules if key[0] == serial]:
+            del self._schedules[key]
+
+    def interval(self, device: Device, endpoint: str) -> timedelta:
+        """Return the current polling interval of a device endpoint, including the backoff."""
+        interval = device.ENDPOINTS[endpoint].interval
+        if (schedule := self._schedules.get((device.serial, endpoint))) is None:
+            return interval
+
+        if (steps := schedule.unchanged - self.backoff_after + 1) > 0:
+            interval = max(interval, min(interval * min(2 ** steps, self.max_backoff), self.max_backoff_interval))
+        return interval
+
+    def next_due(self) -> datetime | None:
+        """Return the next time an endpoint is due, if any."""
+        return min((schedule.due for schedule in self._schedules.values()), default=None)
@@ -6,21 +6,24 @@ from dataclasses import dataclass
 from logging import getLogger
 from collections.abc import Callable
 from datetime import datetime
-from functools import cached_property
 from typing import Any, cast
 
 from homeassistant.components.sensor.const import SensorStateClass, SensorDeviceClass
 
 from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
-from homeassistant.const import UnitOfMass, UnitOfVolume
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory, UnitOfMass, UnitOfTime, UnitOfVolume
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
 
-from .devices import Device
+from .devices import Device, DeviceIndex
 from .devices.feeders.feeder import Feeder
 from .devices.feeders.granary_feeder import GranaryFeeder
 from . import PetLibroHubConfigEntry
-from .entity import PetLibroEntity, _DeviceT, PetLibroEntityDescription
+from .const import SIGNAL_DEVICES_ADDED
+from .entity import PetLibroEntity, _DeviceT, PetLibroEntityDescription, PetLibroHubEntity, device_cached_property
+from .hub import PetLibroHub
 
 
 _LOGGER = getLogger(__name__)
@@ -63,7 +66,7 @@ class PetLibroSensorEntity(PetLibroEntity[_DeviceT], SensorEntity):  # type: ign
 
     entity_description: PetLibroSensorEntityDescription[_DeviceT]  # type: ignore [reportIncompatibleVariableOverride]
 
-    @cached_property
+    @device_cached_property
     def native_value(self) -> float | datetime | str | None:
         """Return the state."""
         if self.entity_description.should_report(self.device):
@@ -72,38 +75,58 @@ class PetLibroSensorEntity(PetLibroEntity[_DeviceT], SensorEntity):  # type: ign
             return cast(float | datetime | None, val)
         return None
 
-    @cached_property
+    @device_cached_property
     def icon(self) -> str | None:
         """Return the icon to use in the frontend, if any."""
         if (icon := self.entity_description.icon_fn(self.state)) is not None:
             return icon
-        return super().icon
+        return self.entity_description.icon
 
-    @cached_property
+    @device_cached_property
     def native_unit_of_measurement(self) -> str | None:
         """Return the native unit of measurement to use in the frontend, if any."""
         if (native_unit_of_measurement := self.entity_description.native_unit_of_measurement_fn(self.device)) is not None:
             return native_unit_of_measurement
-        return super().native_unit_of_measurement
+        return self.entity_description.native_unit_of_measurement
 
-    @cached_property
+    @device_cached_property
     def device_class(self) -> SensorDeviceClass | None:
         """Return the device class to use in the frontend, if any."""
         if (device_class := self.entity_description.device_class_fn(self.device)) is not None:
             return device_class
-        return super().device_class
+        return self.entity_description.device_class
 
 
 DEVICE_SENSOR_MAP: dict[type[Device], list[PetLibroSensorEntityDescription]] = {
+    Feeder: [
+        PetLibroSensorEntityDescription[Feeder](
+            key="last_feed_time",
+            translation_key="last_feed_time",
+            data_keys=("feedingRecords.last_feed_time",),
+            icon="mdi:clock-check-outline",
+            device_class_fn=lambda _: SensorDeviceClass.TIMESTAMP
+        ),
+        PetLibroSensorEntityDescription[Feeder](
+            key="last_feed_quantity",
+            translation_key="last_feed_quantity",
+            data_keys=("feedingRecords.last_feed_quantity", "realInfo.unit_id"),
+            icon="mdi:bowl-mix",
+            native_unit_of_measurement_fn=unit_of_measurement_feeder,
+            device_class_fn=device_class_feeder,
+            state_class=SensorStateClass.MEASUREMENT
+        ),
+    ],
     GranaryFeeder: [
         PetLibroSensorEntityDescription[GranaryFeeder](
             key="remaining_desiccant",
             translation_key="remaining_desiccant",
+            data_keys=("realInfo.remaining_desiccant",),
             icon="mdi:package"
         ),
         PetLibroSensorEntityDescription[GranaryFeeder](
             key="today_feeding_quantity",
             translation_key="today_feeding_quantity",
+            data_keys=("grainStatus.today_feeding_quantity", "realInfo.unit_id"),
             icon="mdi:scale",
             native_unit_of_measurement_fn=unit_of_measurement_feeder,
             device_class_fn=device_class_feeder,
@@ -112,6 +135,7 @@ DEVICE_SENSOR_MAP: dict[type[Device], list[PetLibroSensorEntityDescription]] = {
         PetLibroSensorEntityDescription[GranaryFeeder](
             key="today_feeding_times",
             translation_key="today_feeding_times",
+            data_keys=("grainStatus.today_feeding_times",),
             icon="mdi:history",
             state_class=SensorStateClass.TOTAL_INCREASING
         )
@@ -119,18 +143,82 @@ DEVICE_SENSOR_MAP: dict[type[Device], list[PetLibroSensorEntityDescription]] = {
 }
 
 
+@dataclass(frozen=True, kw_only=True)
+class PetLibroHubSensorEntityDescription(SensorEntityDescription):
+    """A class that describes hub diagnostic sensor entities."""
+
+    value_fn: Callable[[PetLibroHub], StateType]
+    entity_category: EntityCategory = EntityCategory.DIAGNOSTIC
+    entity_registry_enabled_default: bool = False
+
+
+class PetLibroHubSensorEntity(PetLibroHubEntity, SensorEntity):
+    """PETLIBRO hub diagnostic sensor entity."""
+
+    entity_description: PetLibroHubSensorEntityDescription  # type: ignore [reportIncompatibleVariableOverride]
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the state."""
+        return self.entity_description.value_fn(self.hub)
+
+
+HUB_SENSORS: list[PetLibroHubSensorEntityDescription] = [
+    PetLibroHubSensorEntityDescription(
+        key="api_requests",
+        translation_key="api_requests",
+        icon="mdi:cloud-upload",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda hub: hub.api.session.metrics.requests
+    ),
+    PetLibroHubSensorEntityDescription(
+        key="api_errors",
+        translation_key="api_errors",
+        icon="mdi:cloud-alert",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda hub: hub.api.session.metrics.errors
+    ),
+    PetLibroHubSensorEntityDescription(
+        key="api_latency",
+        translation_key="api_latency",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        suggested_display_precision=3,
+        value_fn=lambda hub: hub.api.session.metrics.latency_mean
+    ),
+    PetLibroHubSensorEntityDescription(
+        key="refresh_duration",
+        translation_key="refresh_duration",
+        icon="mdi:timer-sync-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        suggested_display_precision=3,
+        value_fn=lambda hub: hub.refresh_metrics.last_cycle_duration
+    ),
+]
+
+
 async def async_setup_entry(
-    _: HomeAssistant,
+    hass: HomeAssistant,
     entry: PetLibroHubConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up PETLIBRO sensors using config entry."""
     hub = entry.runtime_data
-    entities = [
-        PetLibroSensorEntity(device, hub, description)
-        for device in hub.devices
-        for device_type, entity_descriptions in DEVICE_SENSOR_MAP.items()
-        if isinstance(device, device_type)
-        for description in entity_descriptions
-    ]
-    async_add_entities(entities)
+
+    @callback
+    def async_add_devices(devices: DeviceIndex) -> None:
+        """Add the sensors of devices."""
+        async_add_entities(
+            PetLibroSensorEntity(device, hub, description)
+            for device_type, entity_descriptions in DEVICE_SENSOR_MAP.items()
+            for device in devices.of_type(device_type)
+            for description in entity_descriptions
+        )
+
+    async_add_devices(hub.devices)
+    async_add_entities(PetLibroHubSensorEntity(hub, entry, description) for description in HUB_SENSORS)
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_DEVICES_ADDED.format(entry.entry_id), async_add_devices)
+    )
@@ -0,0 +1,213 @@
+"""Long-term feeding statistics of the PETLIBRO feeders."""
+
+from __future__ import annotations
+
+from asyncio import Lock
+from collections.abc import Iterable
+from datetime import datetime
+from logging import getLogger
+from typing import Any
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics, get_last_statistics
+from homeassistant.const import UnitOfMass, UnitOfVolume
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util, slugify
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN, STORAGE_VERSION
+from .devices.feeders.feeder import Feeder
+from .devices.feeders.models import FeedingRecord
+
+try:
+    from homeassistant.components.recorder.models import StatisticMeanType
+except ImportError:  # Home Assistant < 2025.4, only has_mean
+    StatisticMeanType = None  # type: ignore[assignment,misc]
+
+_LOGGER = getLogger(__name__)
+
+DATA_IMPORT_CURSORS: HassKey[dict[str, ImportCursors]] = HassKey(f"{DOMAIN}_statistics_cursors")
+HAS_UNIT_CLASS = "unit_class" in StatisticMetaData.__annotations__
+"""The recorder takes the unit class of the statistics, from Home Assistant 2025.11."""
+
+UNIT_CLASSES = {
+    UnitOfMass.GRAMS: "mass",
+    UnitOfMass.OUNCES: "mass",
+    UnitOfVolume.MILLILITERS: "volume",
+}
+"""Recorder unit class by feeder unit, cups can't be converted."""
+
+
+def hour_start(time: datetime) -> datetime:
+    """Return the start of the hour of a time, in UTC."""
+    return dt_util.as_utc(time).replace(minute=0, second=0, microsecond=0)
+
+
+def statistic_ids(serial: str) -> tuple[str, str]:
+    """Return the feeding quantity and the feeds statistic IDs of a feeder."""
+    return f"{DOMAIN}:{slugify(serial)}_feeding_quantity", f"{DOMAIN}:{slugify(serial)}_feeds"
+
+
+def statistic_metadata(statistic_id: str, name: str, unit: str | None, unit_class: str | None) -> StatisticMetaData:
+    """Build the metadata of a summed statistic, with the keys known by the running Home Assistant version."""
+    metadata: dict[str, Any] = {
+        "has_sum": True,
+        "name": name,
+        "source": DOMAIN,
+        "statistic_id": statistic_id,
+        "unit_of_measurement": unit,
+    }
+    if StatisticMeanType is not None:
+        metadata["mean_type"] = StatisticMeanType.NONE
+    else:
+        metadata["has_mean"] = False
+    if HAS_UNIT_CLASS:
+        metadata["unit_class"] = unit_class
+    return StatisticMetaData(**metadata)  # type: ignore[typeddict-item]
+
+
+class ImportCursors:
+    """
+    Time of the last feeding record imported by statistic ID
+
+    Saved right after each import: the feeders ingestion cursor is only persisted with the delayed devices snapshot,
+    so the records of the last imported hour can be fetched again after a restart.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        self._store = get_import_cursors_store(hass, entry)
+        self._lock = Lock()
+        self._cursors: dict[str, int] | None = None
+        """Time in milliseconds by statistic ID, loaded once."""
+
+    async def async_get(self, statistic_id: str) -> datetime | None:
+        """Get the time of the last record imported into a statistic."""
+        async with self._lock:
+            if self._cursors is None:
+                self._cursors = await self._store.async_load() or {}
+        if (cursor := self._cursors.get(statistic_id)) is None:
+            return None
+        return dt_util.utc_from_timestamp(cursor / 1000)
+
+    async def async_set(self, statistic_id: str, time: datetime) -> None:
+        """Save the time of the last record imported into a statistic."""
+        assert self._cursors is not None
+        self._cursors[statistic_id] = round(time.timestamp() * 1000)
+        await self._store.async_save(dict(self._cursors))
+
+    async def async_remove(self, ids: Iterable[str]) -> None:
+        """Forget the cursors of statistics, e.g. of a device removed from the account."""
+        async with self._lock:
+            if self._cursors is None:
+                self._cursors = await self._store.async_load() or {}
+            removed = [self._cursors.pop(statistic_id, None) for statistic_id in ids]
+            if any(cursor is not None for cursor in removed):
+                await self._store.async_save(dict(self._cursors))
+
+
+def get_import_cursors_store(hass: HomeAssistant, entry: ConfigEntry) -> Store[dict[str, int]]:
+    """Get the statistics import cursors store of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.statistics")
+
+
+def async_get_import_cursors(hass: HomeAssistant, entry: ConfigEntry) -> ImportCursors:
+    """Get the import cursors shared by the feeders statistics of a config entry, created on first use."""
+    entries = hass.data.setdefault(DATA_IMPORT_CURSORS, {})
+    if (cursors := entries.get(entry.entry_id)) is None:
+        cursors = entries[entry.entry_id] = ImportCursors(hass, entry)
+    return cursors
+
+
+async def async_remove_import_cursors(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the statistics import cursors of a removed config entry."""
+    hass.data.get(DATA_IMPORT_CURSORS, {}).pop(entry.entry_id, None)
+    await get_import_cursors_store(hass, entry).async_remove()
+
+
+class FeedingStatistics:
+    """
+    Hourly feeding quantity and feeds count of a feeder, imported as external statistics
+
+    Each batch of ingested feeding records is added on top of the last imported hour, records fetched after a
+    downtime fill in the hours they happened in. The recorder builds the daily and longer periods from the hourly
+    statistics.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, device: Feeder) -> None:
+        self.hass = hass
+        self.device = device
+        self.cursors = async_get_import_cursors(hass, entry)
+        self._lock = Lock()
+        self._last: dict[str, tuple[datetime, float, float] | None] = {}
+        """Start, state and sum of the last imported hour by statistic ID, read from the recorder once."""
+
+    @property
+    def quantity_id(self) -> str:
+        return statistic_ids(self.device.serial)[0]
+
+    @property
+    def feeds_id(self) -> str:
+        return statistic_ids(self.device.serial)[1]
+
+    async def async_import(self, records: Iterable[FeedingRecord]) -> None:
+        """Add feeding records, oldest first, to the statistics."""
+        records = list(records)
+        async with self._lock:
+            unit = self.device.unit_type
+            await self._async_import(
+                self.quantity_id, f"{self.device.name} feeding quantity", unit, UNIT_CLASSES.get(unit),
+                [(record.time, record.quantity) for record in records]
+            )
+            await self._async_import(
+                self.feeds_id, f"{self.device.name} feeds", None, None, [(record.time, 1) for record in records]
+            )
+
+    async def _async_import(self, statistic_id: str, name: str, unit: str | None, unit_class: str | None,
+                            values: list[tuple[datetime, float]]) -> None:
+        """Import the values of a statistic, summed by hour."""
+        if statistic_id not in self._last:
+            self._last[statistic_id] = await self._async_get_last(statistic_id)
+        last = self._last[statistic_id]
+        imported = await self.cursors.async_get(statistic_id)
+
+        hours: dict[datetime, float] = {}
+        newest: datetime | None = None
+        for time, value in values:
+            start = hour_start(time)
+            if (last is not None and start < last[0]) or (imported is not None and time <= imported):
+                # Already imported
+                continue
+            hours[start] = hours.get(start, 0) + value
+            newest = time if newest is None else max(newest, time)
+        if newest is None:
+            return
+
+        statistics: list[StatisticData] = []
+        total = last[2] if last is not None else 0
+        for start, value in sorted(hours.items()):
+            if last is not None and start == last[0]:
+                # The hour was partly imported, its row is replaced
+                value += last[1]
+                total -= last[1]
+            total += value
+            statistics.append(StatisticData(start=start, state=value, sum=total))
+
+        async_add_external_statistics(
+            self.hass, statistic_metadata(statistic_id, name, unit, unit_class), statistics
+        )
+        self._last[statistic_id] = (statistics[-1]["start"], statistics[-1]["state"], statistics[-1]["sum"])
+        await self.cursors.async_set(statistic_id, newest)
+        _LOGGER.debug("Imported %s hours of %s", len(statistics), statistic_id)
+
+    async def _async_get_last(self, statistic_id: str) -> tuple[datetime, float, float] | None:
+        """Read the last imported hour of a statistic."""
+        last = await get_instance(self.hass).async_add_executor_job(
+            get_last_statistics, self.hass, 1, statistic_id, False, {"state", "sum"}
+        )
+        if not (rows := last.get(statistic_id)):
+            return None
+        row = rows[0]
+        return dt_util.utc_from_timestamp(row["start"]), row.get("state") or 0, row.get("sum") or 0
@@ -4,17 +4,18 @@ from __future__ import annotations
 
 from collections.abc import Callable, Coroutine
 from dataclasses import dataclass
-from functools import cached_property
 from typing import Any, Generic
 
 from homeassistant.components.switch import SwitchEntity, SwitchEntityDescription
 from homeassistant.const import EntityCategory
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from . import PetLibroHubConfigEntry
-from .entity import PetLibroEntity, _DeviceT, PetLibroEntityDescription
-from .devices.device import Device
+from .const import SIGNAL_DEVICES_ADDED
+from .entity import PetLibroEntity, _DeviceT, PetLibroEntityDescription, device_cached_property
+from .devices import Device, DeviceIndex
 from .devices.feeders.feeder import Feeder
 
 
@@ -37,11 +38,13 @@ DEVICE_SWITCH_MAP: dict[type[Device], list[PetLibroSwitchEntityDescription]] = {
         PetLibroSwitchEntityDescription[Feeder](
             key="feeding_plan",
             translation_key="feeding_plan",
+            data_keys=("realInfo.feeding_plan",),
             set_fn=lambda device, value: device.set_feeding_plan(value)
         ),
         PetLibroSwitchEntityDescription[Feeder](
             key="feeding_plan_today_all",
             translation_key="feeding_plan_today_all",
+            data_keys=("feedingPlanTodayNew.all_skipped",),
             set_fn=lambda device, value: device.set_feeding_plan_today_all(value)
         ),
     ]
@@ -53,10 +56,12 @@ class PetLibroSwitchEntity(PetLibroEntity[_DeviceT], SwitchEntity):
 
     entity_description: PetLibroSwitchEntityDescription[_DeviceT]  # type: ignore [reportIncompatibleVariableOverride]
 
-    @cached_property
+    @device_cached_property
     def is_on(self) -> bool | None:
-        """Return true if switch is on."""
-        return bool(getattr(self.device, self.entity_description.key))
+        """Return true if switch is on, None until the device data is fetched."""
+        if (value := getattr(self.device, self.entity_description.key)) is None:
+            return None
+        return bool(value)
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the switch on."""
@@ -68,17 +73,24 @@ class PetLibroSwitchEntity(PetLibroEntity[_DeviceT], SwitchEntity):
 
 
 async def async_setup_entry(
-    _: HomeAssistant,
+    hass: HomeAssistant,
     entry: PetLibroHubConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up PETLIBRO switches using config entry."""
     hub = entry.runtime_data
-    entities = [
-        PetLibroSwitchEntity(device, hub, description)
-        for device in hub.devices
-        for device_type, entity_descriptions in DEVICE_SWITCH_MAP.items()
-        if isinstance(device, device_type)
-        for description in entity_descriptions
-    ]
-    async_add_entities(entities)
+
+    @callback
+    def async_add_devices(devices: DeviceIndex) -> None:
+        """Add the switches of devices."""
+        async_add_entities(
+            PetLibroSwitchEntity(device, hub, description)
+            for device_type, entity_descriptions in DEVICE_SWITCH_MAP.items()
+            for device in devices.of_type(device_type)
+            for description in entity_descriptions
+        )
+
+    async_add_devices(hub.devices)
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_DEVICES_ADDED.format(entry.entry_id), async_add_devices)
+    )
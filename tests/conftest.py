@@ -0,0 +1,35 @@
+"""Fixtures of the PETLIBRO integration tests."""
+
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.petlibro.api import PetLibroAPI
+from custom_components.petlibro.devices.feeders.granary_feeder import GranaryFeeder
+
+SERIAL = "AF0100000001"
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: Any) -> None:
+    """Load the integration from custom_components."""
+
+
+@pytest.fixture
+def api() -> MagicMock:
+    """An API whose requests are set up by each test."""
+    return MagicMock(spec=PetLibroAPI)
+
+
+@pytest.fixture
+def feeder(api: MagicMock) -> GranaryFeeder:
+    """A granary feeder not fetched yet."""
+    return GranaryFeeder({
+        "deviceSn": SERIAL,
+        "name": "Feeder",
+        "productIdentifier": "PLAF103",
+        "productName": "Granary Feeder",
+    }, api)
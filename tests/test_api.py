@@ -0,0 +1,35 @@
+"""Tests of the PETLIBRO API."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.petlibro.api import FEEDING_RECORDS_PAGE_SIZE, PetLibroAPI
+
+
+@pytest.mark.parametrize("newest_first", [True, False])
+async def test_feeding_records_pages(newest_first: bool) -> None:
+    """Every record is fetched once through full pages, whatever their listing order."""
+    since = dt_util.utcnow() - timedelta(hours=1)
+    start = int(since.timestamp() * 1000)
+    times = [start + i * 1000 for i in range(FEEDING_RECORDS_PAGE_SIZE * 2 + 5)]
+    requests: list[dict[str, Any]] = []
+
+    async def post(_: str, json: dict[str, Any], **__: Any) -> list[dict[str, Any]]:
+        requests.append(json)
+        page = [{"recordTime": time} for time in times if json["startTime"] <= time <= json["endTime"]]
+        if newest_first:
+            page.reverse()
+        return [{"workRecords": page[:json["size"]]}]
+
+    api = PetLibroAPI(MagicMock(), "UTC", "US", "token")
+    api.session.post = post  # type: ignore[method-assign]
+
+    records = await api.device_feeding_records("AF0100000001", since)
+    assert [record["recordTime"] for record in records] == times
+    assert len(requests) == 3
@@ -0,0 +1,39 @@
+"""Tests of the PETLIBRO region clients."""
+
+from __future__ import annotations
+
+from aiohttp import ClientTimeout
+from homeassistant.core import HomeAssistant
+
+from custom_components.petlibro.api import DEFAULT_TIMEOUT, ENDPOINT_TIMEOUTS, request_timeout
+from custom_components.petlibro.client import RegionClient
+
+
+async def test_limits_follow_the_users(hass: HomeAssistant) -> None:
+    """The shared limiter applies the lowest limits asked by the users, the client ones if none did."""
+    client = RegionClient(hass, "US", rate=5, burst=10, max_in_flight=4)
+    first, second = object(), object()
+
+    client.attach(first)
+    assert (client.limiter.rate, client.limiter.max_in_flight) == (5, 4)
+    client.attach(second, rate=2, max_in_flight=8)
+    assert (client.limiter.rate, client.limiter.max_in_flight) == (2, 8)
+    client.attach(first, rate=3, max_in_flight=6)
+    assert (client.limiter.rate, client.limiter.max_in_flight) == (2, 6)
+    assert client.limiter.burst == 10
+
+    await client.detach(second)
+    assert (client.limiter.rate, client.limiter.max_in_flight) == (3, 6)
+
+
+async def test_create_api_timeouts(hass: HomeAssistant) -> None:
+    """The requests timeouts given to the client reach the API session."""
+    client = RegionClient(hass, "US")
+    api = client.create_api("token", timeout=request_timeout(3))
+    assert api.session.timeout == ClientTimeout(total=3, connect=3, sock_read=3)
+    assert api.session.timeouts == ENDPOINT_TIMEOUTS
+
+    path_timeout = ClientTimeout(total=60)
+    api = client.create_api("token", timeouts={"/device/device/list": path_timeout})
+    assert api.session.timeout == DEFAULT_TIMEOUT
+    assert api.session.timeouts == {"/device/device/list": path_timeout}
@@ -0,0 +1,128 @@
+"""Tests of the PETLIBRO devices."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.petlibro.api import PetLibroAPI
+from custom_components.petlibro.devices.event import EVENT_FEED
+from custom_components.petlibro.devices.feeders.granary_feeder import GranaryFeeder
+from custom_components.petlibro.devices.feeders.models import FeedingRecord
+from custom_components.petlibro.exceptions import PetLibroAPIError
+
+
+async def test_optimistic_update_rollback_keeps_refreshed_data(feeder: GranaryFeeder) -> None:
+    """A failed update only rolls back the fields still holding the optimistic value."""
+    feeder.apply({"realInfo": {"enableFeedingPlan": False, "unitType": 1}})
+    sent = asyncio.Event()
+    failed = asyncio.Event()
+
+    async def request() -> None:
+        sent.set()
+        await failed.wait()
+        raise PetLibroAPIError("Rejected")
+
+    update = asyncio.create_task(feeder.optimistic_update({"unit_id": 3}, request(), "realInfo"))
+    await sent.wait()
+    assert feeder.unit_id == 3
+
+    # Refreshed while the request is in flight
+    feeder.apply({"realInfo": {"enableFeedingPlan": True, "unitType": 3}})
+    failed.set()
+    with pytest.raises(PetLibroAPIError):
+        await update
+    assert feeder.feeding_plan is True
+    assert feeder.unit_id == 1
+
+    update = asyncio.create_task(feeder.optimistic_update({"unit_id": 2}, request(), "realInfo"))
+    failed.clear()
+    sent.clear()
+    await sent.wait()
+    feeder.apply({"realInfo": {"unitType": 4}})
+    failed.set()
+    with pytest.raises(PetLibroAPIError):
+        await update
+    assert feeder.unit_id == 4
+
+
+async def test_confirm_task_cancelled(feeder: GranaryFeeder, api: MagicMock) -> None:
+    """The confirmation of an update doesn't outlive its device."""
+    confirmed = asyncio.Event()
+
+    async def real_info(*_: object, **__: object) -> dict:
+        await confirmed.wait()
+        return {"enableFeedingPlan": True}
+
+    async def request() -> None:
+        return None
+
+    api.device_real_info.side_effect = real_info
+    await feeder.optimistic_update({"feeding_plan": True}, request(), "realInfo")
+    (task,) = feeder._background_tasks
+    feeder.cancel_tasks()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+def test_live_fields_fall_back_to_the_info_data(api: MagicMock) -> None:
+    """Live fields only reported by the devices list or baseInfo are kept, realInfo takes precedence."""
+    feeder = GranaryFeeder({
+        "deviceSn": "AF0100000002", "productName": "Granary Feeder", "unitType": 3, "remainingDesiccantDays": 20
+    }, api)
+    assert feeder.unit_id == 3
+    assert feeder.remaining_desiccant == 20
+
+    feeder.apply({"realInfo": {"unitType": 1, "enableFeedingPlan": True}})
+    feeder.apply({"baseInfo": {"unitType": 2, "enableFeedingPlan": False}})
+    assert feeder.unit_id == 1
+    assert feeder.feeding_plan is True
+    assert feeder.remaining_desiccant == 20
+
+
+def test_live_fields_kept_by_the_info_projections() -> None:
+    """The devices list and baseInfo responses keep the live fields read as a fallback."""
+    for endpoint in ("list_devices", "device_base_info"):
+        assert {"unitType", "enableFeedingPlan", "remainingDesiccantDays"} <= PetLibroAPI.PROJECTIONS[endpoint]
+
+
+async def test_feeding_records_cursor(feeder: GranaryFeeder, api: MagicMock) -> None:
+    """Feeding records are fetched from the last ingested one, each of them is ingested once."""
+    day = int(dt_util.start_of_local_day().timestamp() * 1000)
+    first, second = day + 1000, day + 2000
+    calls: list[datetime] = []
+
+    async def feeding_records(_: str, since: datetime) -> list[dict]:
+        calls.append(since)
+        # The API may list again a record at the cursor bound
+        return [{"recordTime": time, "actualGrainNum": 1} for time in (first, second) if time >= since.timestamp() * 1000]
+
+    api.device_feeding_records.side_effect = feeding_records
+    await feeder.refresh(["feedingRecords"])
+    assert calls == [dt_util.start_of_local_day()]
+    assert feeder.feeding_history.cursor == second
+
+    await feeder.refresh(["feedingRecords"])
+    assert calls[1] == dt_util.utc_from_timestamp(second / 1000) + timedelta(milliseconds=1)
+    assert len(feeder.feeding_records) == 2
+
+
+def test_feed_events_after_the_history_is_saved(feeder: GranaryFeeder) -> None:
+    """Feed listeners see the feeding history and records of the feeds they are called for."""
+    since = int(dt_util.start_of_local_day().timestamp() * 1000)
+    feeder.apply({"feedingRecords": {"since": since, "records": [{"recordTime": since + 1000}]}})
+    seen: list[tuple[Any, ...]] = []
+
+    def on_feed(record: FeedingRecord) -> None:
+        history = feeder.feeding_history
+        seen.append((record.time, history.last_feed_time if history else None, feeder.feeding_records[-1]))
+
+    feeder.on(EVENT_FEED, on_feed)
+    feeder.apply({"feedingRecords": {"since": since, "records": [{"recordTime": since + 2000, "actualGrainNum": 2}]}})
+    (record,) = list(feeder.feeding_records)[1:]
+    assert seen == [(record.time, record.time, record)]
@@ -0,0 +1,77 @@
+"""Tests of the PETLIBRO entities."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import MagicMock
+
+from homeassistant.const import ATTR_DEVICE_CLASS, ATTR_UNIT_OF_MEASUREMENT, UnitOfMass
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockEntityPlatform
+
+from custom_components.petlibro.devices.feeders.granary_feeder import GranaryFeeder
+from custom_components.petlibro.entity import device_cached_property
+from custom_components.petlibro.sensor import DEVICE_SENSOR_MAP, PetLibroSensorEntity
+
+
+def sensor(feeder: GranaryFeeder, key: str) -> PetLibroSensorEntity[GranaryFeeder]:
+    """Create a sensor of a feeder, on a hub always reporting it available."""
+    hub = MagicMock()
+    hub.is_available.return_value = True
+    description = next(
+        description for description in DEVICE_SENSOR_MAP[GranaryFeeder] if description.key == key
+    )
+    return PetLibroSensorEntity(feeder, hub, description)
+
+
+def test_device_cached_property_follows_generation(feeder: GranaryFeeder) -> None:
+    """The value is recomputed once the device data changed, and can't be assigned."""
+    calls = []
+
+    class Entity:
+        device = feeder
+
+        @device_cached_property
+        def value(self) -> int:
+            calls.append(self.device.generation)
+            return len(calls)
+
+    entity = Entity()
+    assert entity.value == entity.value == 1
+    feeder.apply({"realInfo": {"unitType": 3}})
+    assert entity.value == 2
+    assert calls == [0, 1]
+
+    # A value written in the instance dict, like a Home Assistant cached property does, doesn't shadow it
+    entity.__dict__["value"] = None
+    assert entity.value == 2
+    del entity.value
+    assert entity.value == 3
+
+
+async def test_sensor_unit_before_and_after_first_update(hass: HomeAssistant, feeder: GranaryFeeder) -> None:
+    """The unit and device class read before the first refresh are not kept once the device is fetched."""
+    entity = sensor(feeder, "today_feeding_quantity")
+    await MockEntityPlatform(hass).async_add_entities([entity])
+
+    assert entity.native_unit_of_measurement is None
+    assert entity.device_class is None
+    state = hass.states.get(entity.entity_id)
+    assert state is not None
+    assert ATTR_UNIT_OF_MEASUREMENT not in state.attributes
+
+    feeder.apply({
+        "realInfo": {"unitType": 3},
+        "grainStatus": {"todayFeedingTimes": 1, "todayFeedingQuantity": 2},
+    })
+    # Entities coalesce the device updates of an event loop iteration
+    await asyncio.sleep(0)
+    await hass.async_block_till_done()
+
+    assert entity.native_unit_of_measurement == UnitOfMass.GRAMS
+    assert entity.device_class == "weight"
+    state = hass.states.get(entity.entity_id)
+    assert state is not None
+    assert state.state == "20"
+    assert state.attributes[ATTR_UNIT_OF_MEASUREMENT] == UnitOfMass.GRAMS
+    assert state.attributes[ATTR_DEVICE_CLASS] == "weight"
@@ -0,0 +1,24 @@
+"""Tests of the PETLIBRO devices events."""
+
+from __future__ import annotations
+
+import asyncio
+
+from custom_components.petlibro.devices.event import EVENT_UPDATE, Event
+
+
+async def test_coalesced_listener_gets_every_key() -> None:
+    """A coalesced listener runs once with the keys of all the collected emits."""
+    events = Event()
+    calls: list[tuple[set[str], str]] = []
+    events.on(EVENT_UPDATE, lambda keys, source: calls.append((keys, source)), ("a", "b"), coalesce=0)
+
+    events.emit(EVENT_UPDATE, "first", keys={"a", "c"})
+    events.emit(EVENT_UPDATE, "skipped", keys={"d"})
+    events.emit(EVENT_UPDATE, "last", keys={"b"})
+    await asyncio.sleep(0.01)
+    assert calls == [({"a", "b", "c"}, "last")]
+
+    events.emit(EVENT_UPDATE, "next", keys={"b"})
+    await asyncio.sleep(0.01)
+    assert calls[1:] == [({"b"}, "next")]
@@ -0,0 +1,64 @@
+"""Tests of the PETLIBRO hub."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+import pytest
+from homeassistant.const import CONF_API_TOKEN, CONF_REGION
+from homeassistant.core import HomeAssistant
+
+from custom_components.petlibro.hub import PetLibroHub
+
+
+def listing(*serials: str) -> list[dict[str, Any]]:
+    return [{"deviceSn": serial, "productName": "Granary Feeder"} for serial in serials]
+
+
+async def test_discovery_removes_devices_missing_twice(hass: HomeAssistant) -> None:
+    """A device is only removed once missing from two lists in a row, an empty list removes nothing."""
+    hub = PetLibroHub(hass, {CONF_REGION: "US", CONF_API_TOKEN: "token"})
+    listed = listing("A", "B", "C")
+
+    async def list_devices() -> list[dict[str, Any]]:
+        return listed
+
+    hub.api.list_devices = list_devices  # type: ignore[method-assign]
+    await hub.load_devices(refresh=False)
+
+    listed = []
+    assert await hub.discover_devices() == ([], [])
+
+    listed = listing("A", "B")
+    assert await hub.discover_devices() == ([], [])
+    assert "C" in hub.devices
+
+    # Back in the list, forgotten
+    listed = listing("A", "C")
+    assert await hub.discover_devices() == ([], [])
+    listed = listing("A")
+    added, removed = await hub.discover_devices()
+    assert not added
+    assert [device.serial for device in removed] == ["B"]
+    added, removed = await hub.discover_devices()
+    assert [device.serial for device in removed] == ["C"]
+    assert [device.serial for device in hub.devices] == ["A"]
+    await hub.async_close()
+
+
+async def test_unsupported_device_reported_once(hass: HomeAssistant, caplog: pytest.LogCaptureFixture) -> None:
+    """An unsupported device is reported on the first discovery only."""
+    hub = PetLibroHub(hass, {CONF_REGION: "US", CONF_API_TOKEN: "token"})
+
+    async def list_devices() -> list[dict[str, Any]]:
+        return listing("A") + [{"deviceSn": "X", "productName": "Smart Fountain"}]
+
+    hub.api.list_devices = list_devices  # type: ignore[method-assign]
+    await hub.load_devices(refresh=False)
+    await hub.discover_devices()
+    await hub.discover_devices()
+    assert [
+        record.levelno for record in caplog.records if "Smart Fountain" in record.getMessage()
+    ] == [logging.ERROR, logging.DEBUG, logging.DEBUG]
+    await hub.async_close()
@@ -0,0 +1,43 @@
+"""Tests of the PETLIBRO integration setup."""
+
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant.config_entries import SOURCE_REAUTH, ConfigEntryState
+from homeassistant.const import CONF_API_TOKEN, CONF_EMAIL, CONF_REGION
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.petlibro.api import PetLibroAPI
+from custom_components.petlibro.const import DISCOVERY_INTERVAL, DOMAIN
+
+
+async def test_discovery_auth_failure_starts_reauth(hass: HomeAssistant) -> None:
+    """An authentication failure of the periodic discovery starts the reauthentication."""
+    entry = MockConfigEntry(domain=DOMAIN, title="user@example.com", data={
+        CONF_REGION: "US", CONF_EMAIL: "user@example.com", CONF_API_TOKEN: "token"
+    })
+    entry.add_to_hass(hass)
+    devices: list[dict[str, Any]] = []
+
+    async def list_devices(*_: Any, **__: Any) -> list[dict[str, Any]]:
+        if not devices:
+            raise ConfigEntryAuthFailed("Token expired")
+        return devices
+
+    devices.append({"deviceSn": "A", "productName": "Granary Feeder"})
+    with patch.object(PetLibroAPI, "list_devices", list_devices), \
+            patch("custom_components.petlibro.PetLibroHub.first_refresh"):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        assert entry.state is ConfigEntryState.LOADED
+
+        devices.clear()
+        async_fire_time_changed(hass, dt_util.utcnow() + DISCOVERY_INTERVAL)
+        await hass.async_block_till_done()
+
+    assert [flow["context"]["source"] for flow in hass.config_entries.flow.async_progress()] == [SOURCE_REAUTH]
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,61 @@
+"""Tests of the PETLIBRO requests limiter."""
+
+from __future__ import annotations
+
+import asyncio
+
+from custom_components.petlibro.limiter import PRIORITY_COMMAND, PRIORITY_POLL, RequestLimiter
+
+
+async def test_commands_served_before_polls() -> None:
+    """Waiting requests are served by priority, then in arrival order."""
+    limiter = RequestLimiter(rate=1000, burst=100, max_in_flight=1)
+    served: list[str] = []
+
+    async def request(name: str, priority: int) -> None:
+        async with limiter.slot(priority):
+            served.append(name)
+            await asyncio.sleep(0)
+
+    await limiter.acquire()
+    tasks = [
+        asyncio.create_task(request("poll 1", PRIORITY_POLL)),
+        asyncio.create_task(request("poll 2", PRIORITY_POLL)),
+        asyncio.create_task(request("command", PRIORITY_COMMAND)),
+    ]
+    await asyncio.sleep(0)
+    assert limiter.waiting == 3
+
+    limiter.release()
+    await asyncio.gather(*tasks)
+    assert served == ["command", "poll 1", "poll 2"]
+    assert limiter.in_flight == 0
+
+
+async def test_cancelled_waiter_skipped() -> None:
+    """A request cancelled while waiting doesn't hold a slot."""
+    limiter = RequestLimiter(rate=1000, burst=100, max_in_flight=1)
+    await limiter.acquire()
+    cancelled = asyncio.create_task(limiter.acquire(PRIORITY_COMMAND))
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.sleep(0)
+
+    limiter.release()
+    await waiting
+    assert limiter.in_flight == 1
+    assert limiter.waiting == 0
+
+
+async def test_configure_lets_waiters_through() -> None:
+    """Raising the requests in flight dispatches the waiting requests."""
+    limiter = RequestLimiter(rate=1000, burst=100, max_in_flight=1)
+    await limiter.acquire()
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert not waiting.done()
+
+    limiter.configure(1000, 100, 2)
+    await waiting
+    assert limiter.in_flight == 2
@@ -0,0 +1,66 @@
+"""Tests of the PETLIBRO requests retry and circuit breaker."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.petlibro import retry
+from custom_components.petlibro.exceptions import PetLibroCircuitOpen
+from custom_components.petlibro.retry import CircuitBreaker
+
+
+class Clock:
+    """Monotonic clock moved by the tests."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(retry, "monotonic", clock)
+    return clock
+
+
+def test_breaker_opens_after_threshold(clock: Clock) -> None:
+    breaker = CircuitBreaker(threshold=2, cooldown=30)
+    breaker.record_failure()
+    breaker.before_request()
+    breaker.record_failure()
+    assert breaker.is_open
+    with pytest.raises(PetLibroCircuitOpen):
+        breaker.before_request()
+
+
+def test_breaker_half_open_probe(clock: Clock) -> None:
+    """A single probe goes through per cooldown, a failed probe doubles the cooldown, a successful one closes."""
+    breaker = CircuitBreaker(threshold=1, cooldown=30, max_cooldown=100)
+    breaker.record_failure()
+
+    clock.now += 30
+    breaker.before_request()
+    with pytest.raises(PetLibroCircuitOpen):
+        breaker.before_request()
+
+    breaker.record_failure()
+    assert breaker.cooldown == 60
+    clock.now += 59
+    with pytest.raises(PetLibroCircuitOpen):
+        breaker.before_request()
+    clock.now += 1
+    breaker.before_request()
+
+    breaker.record_failure()
+    assert breaker.cooldown == 100
+
+    clock.now += 100
+    breaker.before_request()
+    breaker.record_success()
+    assert not breaker.is_open
+    assert breaker.cooldown == 30
+    breaker.before_request()
+    breaker.before_request()
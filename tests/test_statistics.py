@@ -0,0 +1,41 @@
+"""Tests of the PETLIBRO feeding statistics."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.petlibro.const import DOMAIN
+from custom_components.petlibro.statistics import (
+    HAS_UNIT_CLASS, async_get_import_cursors, async_remove_import_cursors, statistic_ids, statistic_metadata
+)
+
+
+async def test_import_cursors_removed(hass: HomeAssistant, hass_storage: dict[str, Any]) -> None:
+    """The cursors of a removed device are dropped, the store of a removed entry is deleted."""
+    entry = MockConfigEntry(domain=DOMAIN)
+    key = f"{DOMAIN}.{entry.entry_id}.statistics"
+    cursors = async_get_import_cursors(hass, entry)
+    now = dt_util.utcnow()
+    for serial in ("A", "B"):
+        for statistic_id in statistic_ids(serial):
+            await cursors.async_get(statistic_id)
+            await cursors.async_set(statistic_id, now)
+
+    await cursors.async_remove(statistic_ids("A"))
+    assert set(hass_storage[key]["data"]) == set(statistic_ids("B"))
+
+    await async_remove_import_cursors(hass, entry)
+    assert key not in hass_storage
+    assert async_get_import_cursors(hass, entry) is not cursors
+
+
+def test_statistic_metadata() -> None:
+    """The metadata hold the mean type and the unit class supported by the running version."""
+    metadata = statistic_metadata("petlibro:a_feeds", "Feeds", None, None)
+    assert metadata["has_sum"]
+    assert "mean_type" in metadata or metadata["has_mean"] is False
+    assert ("unit_class" in metadata) is HAS_UNIT_CLASS